@@ -1,13 +1,57 @@
+from __future__ import annotations
+
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+import sys
+import time
+from dataclasses import dataclass, replace
+from functools import cached_property, lru_cache, partial
 from datetime import datetime
-from typing import List, Dict
-import pandas as pd
-from pydantic import BaseModel, validator
-from tkinter.filedialog import askopenfilename
+from pathlib import Path
+from itertools import islice
+from typing import (
+    TYPE_CHECKING, List, Dict, Callable, ClassVar, Iterable, Iterator,
+    Optional, Tuple, Union, get_type_hints
+    )
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas, pydantic, pyarrow, openpyxl, tkinter, zipfile y
+# concurrent.futures se importan recién cuando se usan, así cargar las
+# clases de ratios solo necesita NumPy
+
+
+def cargar_perfil():
+    """
+        perfil.py está en la raíz del repositorio, compartido por
+        analisis contable y finanzas. Se carga por ruta, sin tocar
+        sys.path; si ya se cargó se reutiliza el mismo módulo
+    """
+    import importlib.util
+
+    nombre = 'finanzas_economia_perfil'
+    if nombre not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            nombre, Path(__file__).resolve().parent.parent / 'perfil.py'
+            )
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules[nombre] = modulo
+        spec.loader.exec_module(modulo)
+    return sys.modules[nombre]
+
 
+Perfil = cargar_perfil().Perfil
 
-class Json(BaseModel):
+
+class EstadosFinancieros:
+    """
+        Campos del Balance general y del Estado de resultados.
+        Solo declara los campos: la validación de pydantic está en Json,
+        que se crea la primera vez que se usa (ver modelo_json)
+    """
     periodo: List[int]
     # Balance general
     # Activo
@@ -33,15 +77,644 @@ class Json(BaseModel):
     utilidad_antes_de_impuestos: List[float]
     utilidad_neta: List[float]
 
-    @validator('periodo', each_item=True)
-    def format_timestamp(cls, periodo):
+
+CAMPOS = list(EstadosFinancieros.__annotations__)
+CAMPOS_NUMERICOS = [campo for campo in CAMPOS if campo != 'periodo']
+# Fila de cada campo en el bloque de EstadosCompactos
+INDICE_CAMPOS = {campo: i for i, campo in enumerate(CAMPOS_NUMERICOS)}
+# Convención de signos de modelo.xlsx: activos, pasivos y ventas
+# positivos; costos y gastos negativos
+CAMPOS_NO_NEGATIVOS = (
+    'cuentas_por_cobrar_comerciales_y_otras',
+    'efectivo_y_equivalentes',
+    'inventarios',
+    'propiedades_planta_equipo',
+    'activo_corriente',
+    'activo_no_corriente',
+    'activo_total',
+    'otras_provisiones',
+    'pasivo_corriente',
+    'pasivo_no_corriente',
+    'pasivo_total',
+    'ventas',
+)
+CAMPOS_NO_POSITIVOS = ('costo_de_ventas', 'gastos_financieros')
+
+
+def format_timestamp(cls, periodo):
+    """
+        Convierte para 'periodo' el Timestamp Epoch
+        en milisegundos -> DD-MM-YYYY
+        Excel transforma automáticamente una fecha hacia Epoch,
+        por lo que hay convertirlas de nuevo
+    """
+    return datetime.fromtimestamp(periodo / 1000).strftime("%d-%m-%Y")
+
+
+@lru_cache(maxsize=None)
+def modelo_json() -> type:
+    """
+        Crea el modelo pydantic Json con los campos de EstadosFinancieros
+        y el validador format_timestamp para 'periodo'
+    """
+    from pydantic import create_model, validator
+
+    return create_model(
+        'Json',
+        __module__=__name__,
+        __validators__={
+            'format_timestamp': validator(
+                'periodo', each_item=True, allow_reuse=True
+                )(format_timestamp)
+        },
+        **{
+            campo: (tipo, ...)
+            for campo, tipo in get_type_hints(EstadosFinancieros).items()
+        }
+    )
+
+
+def __getattr__(nombre: str):
+    """
+        main.Json sigue disponible, pero pydantic se carga al primer uso
+    """
+    if nombre == 'Json':
+        return modelo_json()
+    raise AttributeError(f'module {__name__!r} has no attribute {nombre!r}')
+
+
+Serie = Union[List[float], np.ndarray]
+
+
+def columnas_numpy(js: EstadosFinancieros) -> Dict[str, np.ndarray]:
+    """
+        Convierte cada campo numérico de Json en un array float64 contiguo.
+        'periodo' se mantiene fuera porque son fechas en texto.
+        Con EstadosCompactos se devuelven vistas del bloque, sin copiar
+    """
+    if isinstance(js, EstadosCompactos):
+        return js.columnas()
+    return {
+        campo: np.ascontiguousarray(getattr(js, campo), dtype=np.float64)
+        for campo in CAMPOS
+        if campo != 'periodo'
+    }
+
+
+def leer_tabla(file: str) -> pd.DataFrame:
+    """
+        Lee una tabla de estados financieros según la extensión:
+        Excel (por defecto), CSV o Parquet
+    """
+    import pandas as pd
+
+    extension = Path(file).suffix.lower()
+    if extension == '.csv':
+        return pd.read_csv(file)
+    if extension in ('.parquet', '.pq'):
+        return pd.read_parquet(file)
+    return pd.read_excel(file)
+
+
+def leer_bloques(file: str, filas: int) -> Iterator[pd.DataFrame]:
+    """
+        Igual que leer_tabla pero entrega la tabla en bloques de filas,
+        sin cargar el archivo completo en memoria
+    """
+    import pandas as pd
+
+    extension = Path(file).suffix.lower()
+    if extension == '.csv':
+        yield from pd.read_csv(file, chunksize=filas)
+    elif extension in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(file).iter_batches(batch_size=filas):
+            yield lote.to_pandas()
+    else:
+        from openpyxl import load_workbook
+
+        libro = load_workbook(file, read_only=True, data_only=True)
+        try:
+            hoja = libro.active
+            filas_hoja = hoja.iter_rows(values_only=True)
+            encabezado = next(filas_hoja)
+            # Igual que pd.read_excel, se saltan las filas vacías (la hoja
+            # puede traer filas en blanco al final)
+            filas_hoja = (
+                fila for fila in filas_hoja
+                if any(valor is not None for valor in fila)
+            )
+            while True:
+                bloque = list(islice(filas_hoja, filas))
+                if not bloque:
+                    break
+                yield pd.DataFrame(bloque, columns=encabezado)
+        finally:
+            libro.close()
+
+
+def campos_promedio() -> List[str]:
+    """
+        Campos de Json que algún ratio usa como Promedio
+    """
+    return sorted({
+        entrada.campo
+        for ratios in REGISTRO_RATIOS.values()
+        for ratio in ratios.values()
+        for entrada in ratio.entradas
+        if isinstance(entrada, Promedio)
+    })
+
+
+def validar_columnas(tabla: pd.DataFrame, *extra: str):
+    """
+        Verifica que la tabla tenga todas las columnas de Json
+    """
+    faltantes = [
+        campo for campo in [*extra, *CAMPOS]
+        if campo not in tabla.columns
+    ]
+    if faltantes:
+        raise ValueError(f'Faltan columnas en la tabla: {faltantes}')
+
+
+def formato_periodo(periodo: pd.Series) -> np.ndarray:
+    """
+        Igual que format_timestamp pero para toda la columna:
+        fechas o Epoch en milisegundos -> DD-MM-YYYY.
+        Solo se convierte cada fecha distinta una vez
+    """
+    import pandas as pd
+
+    vacios = periodo.isna().to_numpy()
+    if vacios.any():
+        raise ValueError(
+            'La columna periodo tiene valores vacíos en las filas '
+            f'{np.flatnonzero(vacios).tolist()}'
+            )
+    if pd.api.types.is_datetime64_any_dtype(periodo):
+        epoch = periodo.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    elif pd.api.types.is_numeric_dtype(periodo):
+        epoch = periodo.to_numpy(dtype=np.int64)
+    else:
+        return periodo.astype(str).to_numpy()
+    unicos, indices = np.unique(epoch, return_inverse=True)
+    fechas = np.array([
+        datetime.fromtimestamp(valor / 1000).strftime("%d-%m-%Y")
+        for valor in unicos.tolist()
+    ], dtype=object)
+    return fechas[indices]
+
+
+def columnas_tabla(tabla: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+        Pasa cada columna de la tabla directo a un array:
+        'periodo' como texto DD-MM-YYYY y el resto como float64
+    """
+    columnas = {'periodo': formato_periodo(tabla['periodo'])}
+    for campo in CAMPOS:
+        if campo != 'periodo':
+            columnas[campo] = np.ascontiguousarray(
+                tabla[campo].to_numpy(dtype=np.float64)
+                )
+    return columnas
+
+
+def posiciones_empresa(
+    tabla: pd.DataFrame,
+    columna_empresa: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[int, int]]:
+    """
+        Fila y columna (empresa, periodo) de cada fila de una tabla larga,
+        respetando el orden de aparición de empresas y periodos
+    """
+    import pandas as pd
+
+    filas, empresas = pd.factorize(tabla[columna_empresa])
+    posiciones = tabla.groupby(filas, sort=False).cumcount().to_numpy()
+    forma = (len(empresas), posiciones.max() + 1 if len(filas) else 0)
+    return filas, posiciones, np.asarray(empresas), forma
+
+
+def dias_periodo(periodo: pd.Series) -> np.ndarray:
+    """
+        'periodo' como días desde 1970-01-01 (int64): fechas, Epoch en
+        milisegundos o texto DD-MM-YYYY
+    """
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(periodo):
+        fechas = periodo.to_numpy(dtype='datetime64[ms]')
+    elif pd.api.types.is_numeric_dtype(periodo):
+        fechas = periodo.to_numpy(dtype=np.int64).astype('datetime64[ms]')
+    else:
+        fechas = pd.to_datetime(periodo, format='%d-%m-%Y').to_numpy()
+    return fechas.astype('datetime64[D]').view(np.int64)
+
+
+class EstadosCompactos:
+    """
+        Estados financieros en un solo bloque float64 de forma
+        (campo, periodo) o (campo, empresa, periodo); la fila de cada
+        campo está en INDICE_CAMPOS. Las fechas son días desde 1970-01-01
+        (int64); las celdas de relleno (empresas con menos periodos) tienen
+        NaT en dias y NaN en valores.
+        Se puede pasar como js a las clases de Analisis: las columnas son
+        vistas del bloque. La validación revisa todo el bloque de una vez
+        (forma, NaN/inf y signos) en lugar de elemento por elemento.
+        Las fechas se guardan como día calendario, sin la zona horaria que
+        aplica format_timestamp
+    """
+    __slots__ = ('valores', 'dias', 'empresas')
+
+    def __init__(
+        self,
+        valores: np.ndarray,
+        dias: np.ndarray,
+        empresas: Optional[np.ndarray] = None,
+        validar: bool = True
+    ):
+        self.valores = np.ascontiguousarray(valores, dtype=np.float64)
+        self.dias = np.ascontiguousarray(dias, dtype=np.int64)
+        self.empresas = empresas
+        if validar:
+            self.validar()
+
+    @classmethod
+    def desde_tabla(
+        cls,
+        tabla: pd.DataFrame,
+        columna_empresa: Optional[str] = None,
+        validar: bool = True
+    ) -> 'EstadosCompactos':
+        """
+            Tabla de una empresa, o tabla larga con columna_empresa
+        """
+        validar_columnas(tabla, *filter(None, [columna_empresa]))
+        datos = tabla[CAMPOS_NUMERICOS].to_numpy(dtype=np.float64).T
+        dias = dias_periodo(tabla['periodo'])
+        if columna_empresa is None:
+            # Copia propia y escribible: con pandas 3 to_numpy puede
+            # devolver una vista de solo lectura del DataFrame
+            return cls(np.array(datos, order='C'), dias, validar=validar)
+
+        filas, posiciones, empresas, forma = posiciones_empresa(
+            tabla, columna_empresa
+            )
+        valores = np.full((len(CAMPOS_NUMERICOS), *forma), np.nan)
+        valores[:, filas, posiciones] = datos
+        dias_matriz = np.full(forma, np.iinfo(np.int64).min)
+        dias_matriz[filas, posiciones] = dias
+        return cls(valores, dias_matriz, empresas=empresas, validar=validar)
+
+    @classmethod
+    def desde_archivo(cls, file: str, **opciones) -> 'EstadosCompactos':
+        return cls.desde_tabla(leer_tabla(file), **opciones)
+
+    @classmethod
+    def desde_json(
+        cls,
+        js: EstadosFinancieros,
+        validar: bool = True
+    ) -> 'EstadosCompactos':
+        """
+            Desde Json (periodo en texto DD-MM-YYYY)
+        """
+        import pandas as pd
+
+        return cls(
+            np.array([getattr(js, campo) for campo in CAMPOS_NUMERICOS]),
+            dias_periodo(pd.Series(js.periodo)),
+            validar=validar
+        )
+
+    def columna(self, campo: str) -> np.ndarray:
+        return self.valores[INDICE_CAMPOS[campo]]
+
+    def columnas(self) -> Dict[str, np.ndarray]:
+        return {campo: self.valores[i] for campo, i in INDICE_CAMPOS.items()}
+
+    def valido(self) -> np.ndarray:
+        """
+            Celdas con datos (False en el relleno)
+        """
+        return self.dias != np.iinfo(np.int64).min
+
+    def fechas(self) -> np.ndarray:
+        return self.dias.view('datetime64[D]')
+
+    def huella(self) -> tuple:
+        return id(self.valores), self.valores.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.valores.nbytes + self.dias.nbytes
+
+    def problemas(self, signos: bool = True) -> Dict[str, int]:
+        """
+            Número de celdas con problemas por chequeo y campo
+            (p. ej. {'no_finito:ventas': 2, 'signo:inventarios': 1}).
+            Vacío si todo está bien
+        """
+        forma = (len(CAMPOS_NUMERICOS), *self.dias.shape)
+        if self.valores.shape != forma:
+            return {f'forma:{self.valores.shape} != {forma}': 1}
+        if self.empresas is not None and (
+            self.dias.ndim != 2 or len(self.empresas) != self.dias.shape[0]
+        ):
+            return {'forma:empresas': 1}
+
+        valido = self.valido()
+        conteos = {
+            'no_finito': (~np.isfinite(self.valores) & valido)
+        }
+        if signos:
+            conteos['signo'] = np.zeros_like(conteos['no_finito'])
+            filas = [INDICE_CAMPOS[campo] for campo in CAMPOS_NO_NEGATIVOS]
+            conteos['signo'][filas] = self.valores[filas] < 0
+            filas = [INDICE_CAMPOS[campo] for campo in CAMPOS_NO_POSITIVOS]
+            conteos['signo'][filas] = self.valores[filas] > 0
+
+        problemas = {}
+        for chequeo, mascara in conteos.items():
+            por_campo = mascara.reshape(len(CAMPOS_NUMERICOS), -1).sum(axis=1)
+            for i in np.flatnonzero(por_campo):
+                problemas[f'{chequeo}:{CAMPOS_NUMERICOS[i]}'] = int(
+                    por_campo[i]
+                    )
+        return problemas
+
+    def validar(self, signos: bool = True):
+        problemas = self.problemas(signos=signos)
+        if problemas:
+            raise ValueError(f'Estados financieros inválidos: {problemas}')
+
+    def __getattr__(self, nombre: str):
+        """
+            Lectura como Json: cada campo como List y 'periodo' como texto
+            DD-MM-YYYY
+        """
+        if nombre == 'periodo':
+            return [
+                None if fecha is None else fecha.strftime('%d-%m-%Y')
+                for fecha in self.fechas().ravel().astype(object)
+            ]
+        if nombre in INDICE_CAMPOS:
+            return self.columna(nombre).tolist()
+        raise AttributeError(nombre)
+
+
+FORMATOS_SALIDA = ('csv', 'parquet', 'arrow', 'feather', 'npz')
+
+
+def escribir_resultados(
+    columnas: Iterable[Tuple[str, Serie]],
+    salida: str,
+    formato: Optional[str] = None,
+    float32: bool = False
+):
+    """
+        Escribe las columnas de resultados directo desde los arrays.
+        formato (por defecto la extensión de salida):
+            csv
+            parquet
+            arrow / feather: Arrow IPC, la lectura es casi sin copia
+            npz: binario columnar de NumPy, un .npy sin comprimir por columna
+        float32=True guarda las columnas float64 como float32
+    """
+    import pandas as pd
+
+    formato = (formato or Path(salida).suffix.lstrip('.')).lower()
+    if formato not in FORMATOS_SALIDA:
+        raise ValueError(
+            f'Formato {formato!r} no soportado, usar uno de {FORMATOS_SALIDA}'
+            )
+
+    def como_array(valores: Serie) -> np.ndarray:
+        valores = np.asarray(valores)
+        if float32 and valores.dtype == np.float64:
+            return valores.astype(np.float32)
+        return valores
+
+    if formato == 'npz':
+        import zipfile
+
+        # Cada columna se escribe apenas se recibe
+        with zipfile.ZipFile(salida, 'w', allowZip64=True) as archivo:
+            for nombre, valores in columnas:
+                valores = como_array(valores)
+                if valores.dtype == object:
+                    valores = valores.astype(str)
+                with archivo.open(f'{nombre}.npy', 'w') as npy:
+                    np.lib.format.write_array(
+                        npy, valores, allow_pickle=False
+                        )
+        return
+
+    nombres, arrays = [], []
+    for nombre, valores in columnas:
+        nombres.append(nombre)
+        arrays.append(como_array(valores))
+
+    if formato == 'csv':
+        pd.DataFrame(dict(zip(nombres, arrays))).to_csv(salida, index=False)
+        return
+
+    import pyarrow as pa
+
+    tabla = pa.table(arrays, names=nombres)
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+
+        pq.write_table(tabla, salida)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(tabla, salida)
+
+
+def leer_resultados(file: str) -> pd.DataFrame:
+    """
+        Lee resultados escritos con escribir_resultados
+    """
+    import pandas as pd
+
+    extension = Path(file).suffix.lower()
+    if extension == '.npz':
+        with np.load(file, allow_pickle=False) as datos:
+            return pd.DataFrame({nombre: datos[nombre] for nombre in datos})
+    if extension in ('.arrow', '.feather'):
+        return pd.read_feather(file)
+    return leer_tabla(file)
+
+
+PERFIL = Perfil()
+
+
+def media_movil(valores: np.ndarray, periodos: int) -> np.ndarray:
+    """
+        Media de los últimos periodos valores sobre el último eje, con
+        sumas prefijas (O(n) sin importar el tamaño de la ventana).
+        Los primeros periodos usan los valores que hay (media acumulada).
+        Un valor no finito solo deja en NaN las ventanas que lo contienen:
+        se suman aparte los valores finitos y la cantidad de no finitos
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    n = valores.shape[-1]
+    no_finitos = ~np.isfinite(valores)
+    prefijo = np.zeros(valores.shape[:-1] + (n + 1,))
+    np.cumsum(np.where(no_finitos, 0.0, valores), axis=-1,
+              out=prefijo[..., 1:])
+    prefijo_no_finitos = np.zeros(prefijo.shape, dtype=np.int64)
+    np.cumsum(no_finitos, axis=-1, out=prefijo_no_finitos[..., 1:])
+    fin = np.arange(1, n + 1)
+    inicio = np.maximum(fin - periodos, 0)
+    medias = (prefijo[..., fin] - prefijo[..., inicio]) / (fin - inicio)
+    invalidas = (
+        prefijo_no_finitos[..., fin] - prefijo_no_finitos[..., inicio]
+    ) > 0
+    medias[invalidas] = np.nan
+    return medias
+
+
+def media_exponencial(valores: np.ndarray, alfa: float) -> np.ndarray:
+    """
+        Media móvil exponencial sobre el último eje:
+            m_0 = x_0, m_t = alfa * x_t + (1 - alfa) * m_(t-1)
+        Un paso por periodo, vectorizado sobre las demás dimensiones
+        (p. ej. todas las empresas a la vez).
+        Un valor no finito deja en NaN solo su periodo: la media anterior
+        sigue al periodo siguiente
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    medias = np.empty_like(valores)
+    finitos = np.isfinite(valores)
+    # NaN hasta el primer valor finito de cada serie
+    previa = np.full(valores.shape[:-1], np.nan)
+    for t in range(valores.shape[-1]):
+        actual = np.where(
+            np.isnan(previa),
+            valores[..., t],
+            alfa * valores[..., t] + (1 - alfa) * previa
+        )
+        previa = np.where(finitos[..., t], actual, previa)
+        medias[..., t] = np.where(finitos[..., t], actual, np.nan)
+    return medias
+
+
+TIPOS_VENTANA = ('acumulada', 'movil', 'dos_puntos', 'exponencial')
+
+
+@dataclass(frozen=True)
+class Ventana:
+    """
+        Cómo se promedia un campo para los ratios de rotación:
+            acumulada: media de todos los periodos hasta el actual
+            movil: media de los últimos periodos
+            dos_puntos: (saldo inicial + saldo final) / 2, el clásico
+                promedio de balance (igual a movil con periodos=2)
+            exponencial: media móvil exponencial con factor alfa
+        En el primer periodo todas devuelven el valor del periodo
+    """
+    tipo: str = 'acumulada'
+    periodos: int = 2
+    alfa: float = 0.5
+
+    def __post_init__(self):
+        if self.tipo not in TIPOS_VENTANA:
+            raise ValueError(
+                f'Ventana {self.tipo!r} no soportada: {TIPOS_VENTANA}'
+                )
+        if self.periodos < 1:
+            raise ValueError('periodos debe ser al menos 1')
+        if not 0 < self.alfa <= 1:
+            raise ValueError('alfa debe estar en (0, 1]')
+
+    def aplicar(self, valores: Serie) -> Serie:
         """
-            Convierte para 'periodo' el Timestamp Epoch
-            en milisegundos -> DD-MM-YYYY
-            Excel transforma automáticamente una fecha hacia Epoch,
-            por lo que hay convertirlas de nuevo
+            Promedia sobre el último eje; en modo List devuelve List
         """
-        return datetime.fromtimestamp(periodo / 1000).strftime("%d-%m-%Y")
+        if self.tipo == 'acumulada':
+            return cumulative_mean(valores)
+        if self.tipo == 'exponencial':
+            medias = media_exponencial(valores, self.alfa)
+        else:
+            periodos = 2 if self.tipo == 'dos_puntos' else self.periodos
+            medias = media_movil(valores, periodos)
+        return medias if isinstance(valores, np.ndarray) else medias.tolist()
+
+
+@dataclass(frozen=True)
+class Promedio:
+    """
+        Entrada de un ratio: promedio de un campo de Json, por defecto la
+        media acumulada. Analisis(ventanas=...) puede cambiar la ventana
+        de cada ratio
+    """
+    campo: str
+    ventana: Ventana = Ventana()
+
+
+@dataclass(frozen=True)
+class Ratio:
+    """
+        Definición declarativa de un ratio.
+        Las entradas pueden ser campos de Json, otros ratios de la misma
+        categoría o un Promedio
+    """
+    nombre: str
+    categoria: str
+    entradas: Tuple[Union[str, Promedio], ...]
+    formula: Callable
+
+
+# categoría (nombre de la clase) -> nombre del ratio -> Ratio
+REGISTRO_RATIOS: Dict[str, Dict[str, Ratio]] = {}
+
+
+@lru_cache(maxsize=None)
+def ratios_clase(clase: type) -> Dict[str, Ratio]:
+    """
+        Ratios de una clase incluidos los heredados; si una subclase
+        redefine un ratio queda el suyo. Los ratios se registran al crear
+        la clase, así el resultado se puede guardar
+    """
+    ratios: Dict[str, Ratio] = {}
+    for base in reversed(clase.__mro__):
+        ratios.update(REGISTRO_RATIOS.get(base.__name__, {}))
+    return ratios
+
+
+class ratio:
+    """
+        Decorador para declarar un ratio dentro de una clase de Analisis.
+        La fórmula recibe las entradas en el mismo orden y debe funcionar
+        tanto con float como con np.ndarray.
+        Se registra una sola vez al importar el módulo; desde una instancia
+        se obtiene un método que evalúa la fórmula
+    """
+
+    def __init__(self, *entradas: Union[str, Promedio]):
+        self.entradas = entradas
+
+    def __call__(self, formula: Callable) -> 'ratio':
+        self.formula = formula
+        return self
+
+    def __set_name__(self, owner: type, nombre: str):
+        self.ratio = Ratio(
+            nombre=nombre,
+            categoria=owner.__name__,
+            entradas=self.entradas,
+            formula=self.formula
+        )
+        REGISTRO_RATIOS.setdefault(owner.__name__, {})[nombre] = self.ratio
+
+    def __get__(self, instancia, owner):
+        if instancia is None:
+            return self
+        return partial(instancia.calcular, self.ratio)
 
 
 @dataclass
@@ -49,8 +722,196 @@ class Analisis(object):
     """
         Parent Class para las demás clases de Analisis.
         Hereda el Balance general y el Estados de Resultados
+
+        vectorizado=True calcula cada ratio como una expresión sobre
+        arrays de NumPy (devuelve np.ndarray).
+        vectorizado=False mantiene el cálculo original elemento por
+        elemento con List, útil para comparar resultados
+
+        js puede ser None si ya se pasan las columnas (p. ej. arrays 2-D
+        empresa × periodo de GenerarResultadosLote)
+
+        promedios permite entregar ya calculados los valores de Promedio
+        por campo (p. ej. medias acumuladas que siguen de un bloque anterior)
+
+        ventanas elige, por nombre de ratio, la Ventana (o su tipo como
+        texto) de sus entradas Promedio, p. ej.
+        {'rotacion_de_inventarios': 'dos_puntos'}
+
+        propagar_nan=True no lanza ZeroDivisionError: las divisiones entre
+        cero dan inf o NaN como en NumPy y el cálculo sigue; invalidos()
+        marca las celdas que quedaron sin un valor finito
+
+        Cada ratio y cada Promedio se calcula una sola vez por instancia
+        y se guarda en cache. La cache se vacía sola si cambian los datos
+        (se reasigna o cambia de largo un campo de Json); para cambios
+        elemento por elemento dentro de una List se usa invalidar()
+    """
+    js: Optional[EstadosFinancieros]
+    vectorizado: bool = True
+    columnas: Optional[Dict[str, np.ndarray]] = None
+    promedios: Optional[Dict[str, Serie]] = None
+    propagar_nan: bool = False
+    ventanas: Optional[Dict[str, Union[Ventana, str]]] = None
+
+    def __post_init__(self):
+        if self.vectorizado and self.columnas is None:
+            self.columnas = columnas_numpy(self.js)
+        self.ventanas = {
+            nombre: Ventana(ventana) if isinstance(ventana, str) else ventana
+            for nombre, ventana in (self.ventanas or {}).items()
+        }
+        self.cache: Dict[Union[str, Promedio], Serie] = {}
+        self.huella = self.huella_datos()
+
+    def huella_datos(self) -> tuple:
+        """
+            Identifica los datos actuales: identidad y largo de cada campo
+        """
+        if self.js is None:
+            return tuple(
+                (id(valores), valores.shape)
+                for valores in self.columnas.values()
+            )
+        if isinstance(self.js, EstadosCompactos):
+            return self.js.huella()
+        return tuple(
+            (id(valores), len(valores))
+            for valores in (
+                getattr(self.js, campo) for campo in CAMPOS
+            )
+        )
+
+    def invalidar(self):
+        """
+            Vacía la cache y vuelve a leer las columnas de Json
+        """
+        self.cache.clear()
+        if self.vectorizado and self.js is not None:
+            self.columnas = columnas_numpy(self.js)
+        self.huella = self.huella_datos()
+
+    def memo(self, clave: Union[str, Promedio], calculo: Callable) -> Serie:
+        """
+            Devuelve el valor en cache o lo calcula una sola vez
+        """
+        if self.huella != self.huella_datos():
+            self.invalidar()
+        if clave not in self.cache:
+            valores = calculo()
+            if isinstance(valores, np.ndarray):
+                # Se comparte entre ratios, no se debe modificar
+                valores.flags.writeable = False
+            self.cache[clave] = valores
+        return self.cache[clave]
+
+    def columna(self, campo: str) -> Serie:
+        """
+            Devuelve un campo de Json como array o como List
+            según el modo de cálculo
+        """
+        if self.vectorizado:
+            return self.columnas[campo]
+        return getattr(self.js, campo)
+
+    def entrada(
+        self,
+        entrada: Union[str, Promedio],
+        ratio: Optional[Ratio] = None
+    ) -> Serie:
+        """
+            Resuelve una entrada de Ratio: Promedio, otro ratio
+            de la clase o un campo de Json
+        """
+        if isinstance(entrada, Promedio):
+            if self.promedios is not None:
+                return self.promedios[entrada.campo]
+            if ratio is not None and ratio.nombre in self.ventanas:
+                entrada = replace(entrada, ventana=self.ventanas[ratio.nombre])
+            return self.memo(
+                entrada,
+                lambda: entrada.ventana.aplicar(self.columna(entrada.campo))
+                )
+        if entrada in ratios_clase(type(self)):
+            return getattr(self, entrada)()
+        return self.columna(entrada)
+
+    def calcular(self, ratio: Ratio) -> Serie:
+        if PERFIL.activo:
+            with PERFIL.etapa(f'{ratio.categoria}.{ratio.nombre}'):
+                return self.calcular_ratio(ratio)
+        return self.calcular_ratio(ratio)
+
+    def calcular_ratio(self, ratio: Ratio) -> Serie:
+        valores = self.memo(
+            ratio.nombre,
+            lambda: self.evaluar(
+                ratio.formula,
+                *(self.entrada(e, ratio) for e in ratio.entradas)
+                )
+            )
+        # En modo List se entrega una copia para no alterar la cache
+        return valores if self.vectorizado else list(valores)
+
+    def evaluar(self, formula: Callable, *series: Serie) -> Serie:
+        """
+            Aplica la fórmula de un ratio.
+            Vectorizado: una sola expresión sobre los arrays completos.
+            List: la fórmula se aplica a cada elemento de zip(*series).
+            En ambos modos una división entre cero lanza ZeroDivisionError,
+            salvo con propagar_nan
+        """
+        if not self.vectorizado:
+            if self.propagar_nan:
+                return [
+                    evaluar_elemento(formula, valores)
+                    for valores in zip(*series)
+                ]
+            return [formula(*valores) for valores in zip(*series)]
+        if self.propagar_nan:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return formula(*series)
+        try:
+            with np.errstate(divide='raise', invalid='raise'):
+                return formula(*series)
+        except FloatingPointError as error:
+            raise ZeroDivisionError(str(error)) from error
+
+    def invalidos(self) -> Dict[str, np.ndarray]:
+        """
+            Máscara por ratio de las celdas sin un valor finito
+            (división entre cero, 0/0 o una entrada NaN)
+        """
+        return {
+            nombre: ~np.isfinite(
+                np.asarray(getattr(self, nombre)(), dtype=np.float64)
+                )
+            for nombre in sorted(ratios_clase(type(self)))
+        }
+
+
+def evaluar_elemento(formula: Callable, valores: tuple) -> float:
+    """
+        Un elemento en modo List con propagar_nan: si hay una división
+        entre cero se repite con float64 de NumPy, así da el mismo inf o
+        NaN que el modo vectorizado
+    """
+    try:
+        return formula(*valores)
+    except ZeroDivisionError:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(formula(*map(np.float64, valores)))
+
+
+def contar_invalidos(invalidos: Dict[str, np.ndarray]) -> Dict[str, int]:
     """
-    js: Json
+        Número de celdas inválidas por ratio (solo los que tienen alguna)
+    """
+    return {
+        nombre: int(mascara.sum())
+        for nombre, mascara in invalidos.items()
+        if mascara.any()
+    }
 
 
 @dataclass
@@ -60,70 +921,44 @@ class AnalisisLiquidez(Analisis):
         Para analizar la liquidez
     """
 
-    def dias_cobro(self):
-        return [
-            (cuentas_por_cobrar * 365)
-            / ventas
-            for cuentas_por_cobrar, ventas in
-            zip(
-                self.js.cuentas_por_cobrar_comerciales_y_otras,
-                self.js.ventas
-                )
-        ]
+    @ratio('cuentas_por_cobrar_comerciales_y_otras', 'ventas')
+    def dias_cobro(cuentas_por_cobrar, ventas):
+        return (cuentas_por_cobrar * 365) / ventas
 
-    def dias_inventario(self):
-        return [
-            abs((inventarios * 365)
-                / costo_de_ventas)
-            for inventarios, costo_de_ventas in
-            zip(
-                self.js.inventarios,
-                self.js.costo_de_ventas
-                )
-        ]
+    @ratio('inventarios', 'costo_de_ventas')
+    def dias_inventario(inventarios, costo_de_ventas):
+        return abs((inventarios * 365) / costo_de_ventas)
 
-    def razon_acida(self):
-        return [
-            (activo_corriente - inventarios) / pasivo_corriente
-            for activo_corriente, inventarios, pasivo_corriente in
-            zip(
-                self.js.activo_corriente,
-                self.js.inventarios,
-                self.js.pasivo_corriente
-                )
-        ]
+    @ratio('activo_corriente', 'inventarios', 'pasivo_corriente')
+    def razon_acida(activo_corriente, inventarios, pasivo_corriente):
+        return (activo_corriente - inventarios) / pasivo_corriente
 
-    def razon_super_acida(self):
-        return [
+    @ratio(
+        'activo_corriente',
+        'inventarios',
+        'cuentas_por_cobrar_comerciales_y_otras',
+        'pasivo_corriente'
+        )
+    def razon_super_acida(
+        activo_corriente,
+        inventarios,
+        cuentas_por_cobrar,
+        pasivo_corriente
+    ):
+        return (
             (activo_corriente -
              inventarios -
              cuentas_por_cobrar)
             / pasivo_corriente
-            for activo_corriente,
-            inventarios,
-            cuentas_por_cobrar,
-            pasivo_corriente in
-            zip(
-                self.js.activo_corriente,
-                self.js.inventarios,
-                self.js.cuentas_por_cobrar_comerciales_y_otras,
-                self.js.pasivo_corriente
-                )
-        ]
+        )
 
-    def razon_corriente(self):
-        return [
-            activo_corriente / pasivo_corriente
-            for activo_corriente, pasivo_corriente in
-            zip(self.js.activo_corriente, self.js.pasivo_corriente)
-        ]
+    @ratio('activo_corriente', 'pasivo_corriente')
+    def razon_corriente(activo_corriente, pasivo_corriente):
+        return activo_corriente / pasivo_corriente
 
-    def razon_de_conversion(self):
-        return [
-            dias_cobro / dias_inventario
-            for dias_cobro, dias_inventario in
-            zip(self.dias_cobro(), self.dias_inventario())
-        ]
+    @ratio('dias_cobro', 'dias_inventario')
+    def razon_de_conversion(dias_cobro, dias_inventario):
+        return dias_cobro / dias_inventario
 
 
 @dataclass
@@ -133,51 +968,33 @@ class AnalisisSolvenciaRiesgo(Analisis):
         Para analizar la solvencia y el riesgo
     """
 
-    def pasivo_no_corriente_sobre_activo(self):
-        return [
-            pasivo_no_corriente / activo_total
-            for pasivo_no_corriente, activo_total in
-            zip(self.js.pasivo_no_corriente, self.js.activo_total)
-        ]
+    @ratio('pasivo_no_corriente', 'activo_total')
+    def pasivo_no_corriente_sobre_activo(pasivo_no_corriente, activo_total):
+        return pasivo_no_corriente / activo_total
 
-    def pasivo_no_corriente_sobre_patrimonio(self):
-        return [
-            pasivo_no_corriente / patrimonio
-            for pasivo_no_corriente, patrimonio in
-            zip(self.js.pasivo_no_corriente, self.js.patrimonio)
-        ]
+    @ratio('pasivo_no_corriente', 'patrimonio')
+    def pasivo_no_corriente_sobre_patrimonio(pasivo_no_corriente, patrimonio):
+        return pasivo_no_corriente / patrimonio
 
-    def pasivo_sobre_activos(self):
-        return [
-            pasivo_total / activo_total
-            for pasivo_total, activo_total in
-            zip(self.js.pasivo_total, self.js.activo_total)
-        ]
+    @ratio('pasivo_total', 'activo_total')
+    def pasivo_sobre_activos(pasivo_total, activo_total):
+        return pasivo_total / activo_total
 
-    def patrimonio_sobre_activos(self):
-        return [
-            patrimonio / activo_total
-            for patrimonio, activo_total in
-            zip(self.js.patrimonio, self.js.activo_total)
-        ]
+    @ratio('patrimonio', 'activo_total')
+    def patrimonio_sobre_activos(patrimonio, activo_total):
+        return patrimonio / activo_total
 
-    def periodo_de_intereses_ganados(self):
-        return [
-            utilidad_operativa / gastos_financieros
-            for utilidad_operativa, gastos_financieros in
-            zip(self.js.utilidad_operativa, self.js.gastos_financieros)
-        ]
+    @ratio('utilidad_operativa', 'gastos_financieros')
+    def periodo_de_intereses_ganados(utilidad_operativa, gastos_financieros):
+        return utilidad_operativa / gastos_financieros
 
-    def razon_de_flujo_de_efectivo(self):
-        return [
-            (utilidad_neta - otras_provisiones) / pasivo_corriente
-            for utilidad_neta, otras_provisiones, pasivo_corriente in
-            zip(
-                self.js.utilidad_neta,
-                self.js.otras_provisiones,
-                self.js.pasivo_corriente
-                )
-        ]
+    @ratio('utilidad_neta', 'otras_provisiones', 'pasivo_corriente')
+    def razon_de_flujo_de_efectivo(
+        utilidad_neta,
+        otras_provisiones,
+        pasivo_corriente
+    ):
+        return (utilidad_neta - otras_provisiones) / pasivo_corriente
 
 
 @dataclass
@@ -187,33 +1004,21 @@ class RendimientoOperativo(Analisis):
         Para analizar el rendimiento operativo
     """
 
-    def margen_antes_de_impuesto(self):
-        return [
-            utilidad_antes_de_impuestos / ventas
-            for utilidad_antes_de_impuestos, ventas in
-            zip(self.js.utilidad_antes_de_impuestos, self.js.ventas)
-        ]
+    @ratio('utilidad_antes_de_impuestos', 'ventas')
+    def margen_antes_de_impuesto(utilidad_antes_de_impuestos, ventas):
+        return utilidad_antes_de_impuestos / ventas
 
-    def margen_bruto(self):
-        return [
-            (ventas - costo_de_ventas) / ventas
-            for ventas, costo_de_ventas in
-            zip(self.js.ventas, self.js.costo_de_ventas)
-        ]
+    @ratio('ventas', 'costo_de_ventas')
+    def margen_bruto(ventas, costo_de_ventas):
+        return (ventas - costo_de_ventas) / ventas
 
-    def margen_de_utilidad_neta(self):
-        return [
-            utilidad_neta / ventas
-            for utilidad_neta, ventas in
-            zip(self.js.utilidad_neta, self.js.ventas)
-        ]
+    @ratio('utilidad_neta', 'ventas')
+    def margen_de_utilidad_neta(utilidad_neta, ventas):
+        return utilidad_neta / ventas
 
-    def margen_operativo(self):
-        return [
-            utilidad_operativa / ventas
-            for utilidad_operativa, ventas in
-            zip(self.js.utilidad_operativa, self.js.ventas)
-        ]
+    @ratio('utilidad_operativa', 'ventas')
+    def margen_operativo(utilidad_operativa, ventas):
+        return utilidad_operativa / ventas
 
 
 @dataclass
@@ -223,89 +1028,76 @@ class AnalisisDupont(Analisis):
         Para analizar el sistema Dupont
     """
 
-    def apalancamiento_financiero(self):
-        return [
+    @ratio(
+        'utilidad_antes_de_impuestos',
+        'utilidad_operativa',
+        'multiplicador_del_capital'
+        )
+    def apalancamiento_financiero(
+        utilidad_antes_de_impuestos,
+        utilidad_operativa,
+        multiplicador_del_capital
+    ):
+        return (
             (utilidad_antes_de_impuestos / utilidad_operativa) *
             multiplicador_del_capital
-            for utilidad_antes_de_impuestos,
-            utilidad_operativa,
-            multiplicador_del_capital in
-            zip(
-                self.js.utilidad_antes_de_impuestos,
-                self.js.utilidad_operativa,
-                self.multiplicador_del_capital()
-                )
-        ]
+        )
 
-    def efecto_fiscal(self):
-        return [
-            utilidad_neta / utilidad_antes_de_impuestos
-            for utilidad_neta, utilidad_antes_de_impuestos in
-            zip(self.js.utilidad_neta, self.js.utilidad_antes_de_impuestos)
-        ]
+    @ratio('utilidad_neta', 'utilidad_antes_de_impuestos')
+    def efecto_fiscal(utilidad_neta, utilidad_antes_de_impuestos):
+        return utilidad_neta / utilidad_antes_de_impuestos
 
-    def margen_neto(self):
-        return [
-            utilidad_neta / ventas
-            for utilidad_neta, ventas in
-            zip(self.js.utilidad_neta, self.js.ventas)
-        ]
+    @ratio('utilidad_neta', 'ventas')
+    def margen_neto(utilidad_neta, ventas):
+        return utilidad_neta / ventas
 
-    def margen_operativo(self):
-        return [
-            utilidad_operativa / ventas
-            for utilidad_operativa, ventas in
-            zip(self.js.utilidad_operativa, self.js.ventas)
-        ]
+    @ratio('utilidad_operativa', 'ventas')
+    def margen_operativo(utilidad_operativa, ventas):
+        return utilidad_operativa / ventas
 
-    def multiplicador_del_capital(self):
-        return [
-            activo_total / patrimonio
-            for activo_total, patrimonio in
-            zip(self.js.activo_total, self.js.patrimonio)
-        ]
+    @ratio('activo_total', 'patrimonio')
+    def multiplicador_del_capital(activo_total, patrimonio):
+        return activo_total / patrimonio
 
-    def rotacion_de_activos(self):
-        return [
-            ventas / activo_total
-            for ventas, activo_total in
-            zip(self.js.ventas, self.js.activo_total)
-        ]
+    @ratio('ventas', 'activo_total')
+    def rotacion_de_activos(ventas, activo_total):
+        return ventas / activo_total
 
-    def roe(self):
-        return [
-            margen_neto * rotacion_de_activos * multiplicador_del_capital
-            for margen_neto, rotacion_de_activos, multiplicador_del_capital in
-            zip(
-                self.margen_neto(),
-                self.rotacion_de_activos(),
-                self.multiplicador_del_capital()
-                )
-        ]
+    @ratio('margen_neto', 'rotacion_de_activos', 'multiplicador_del_capital')
+    def roe(margen_neto, rotacion_de_activos, multiplicador_del_capital):
+        return margen_neto * rotacion_de_activos * multiplicador_del_capital
 
-    def roe_extendido(self):
-        return [
+    @ratio(
+        'efecto_fiscal',
+        'margen_operativo',
+        'rotacion_de_activos',
+        'apalancamiento_financiero'
+        )
+    def roe_extendido(
+        efecto_fiscal,
+        margen_operativo,
+        rotacion_de_activos,
+        apalancamiento_financiero
+    ):
+        return (
             efecto_fiscal *
             margen_operativo *
             rotacion_de_activos *
             apalancamiento_financiero
-            for efecto_fiscal,
-            margen_operativo,
-            rotacion_de_activos,
-            apalancamiento_financiero in
-            zip(
-                self.efecto_fiscal(),
-                self.margen_operativo(),
-                self.rotacion_de_activos(),
-                self.apalancamiento_financiero()
-                )
-        ]
+        )
 
 
-def cumulative_mean(numbers: List):
+def cumulative_mean(numbers: Serie) -> Serie:
     """
-        Función para calcular la media acumuluda de una List
+        Función para calcular la media acumuluda de una List.
+        Si recibe un np.ndarray se calcula con cumsum sobre el último eje
     """
+    if isinstance(numbers, np.ndarray):
+        return (
+            np.cumsum(numbers, axis=-1)
+            / np.arange(1, numbers.shape[-1] + 1)
+        )
+
     cumulative_sum = 0
     cumulative_mean_values = []
 
@@ -321,69 +1113,122 @@ def cumulative_mean(numbers: List):
 class ExplotacionActivos(Analisis):
     """
         Child Class de Analisis.
-        Para analizar la rotación según el promedio (se considera un cum mean)
+        Para analizar la rotación según el promedio (por defecto un cum
+        mean; con ventanas se puede usar movil, dos_puntos o exponencial
+        por ratio)
     """
 
-    def rotacion_de_inventarios(self):
-        promedio_lista = cumulative_mean(self.js.inventarios)
-        return [
-            abs(costo_de_ventas / promedio)
-            for costo_de_ventas, promedio in
-            zip(self.js.costo_de_ventas, promedio_lista)
-        ]
+    @ratio('costo_de_ventas', Promedio('inventarios'))
+    def rotacion_de_inventarios(costo_de_ventas, promedio):
+        return abs(costo_de_ventas / promedio)
 
-    def rotacion_de_cuentas_por_cobrar_comerciales_y_otras(self):
-        promedio_lista = cumulative_mean(
-            self.js.cuentas_por_cobrar_comerciales_y_otras
-            )
-        return [
-            ventas / promedio
-            for ventas, promedio in
-            zip(self.js.ventas, promedio_lista)
-        ]
+    @ratio('ventas', Promedio('cuentas_por_cobrar_comerciales_y_otras'))
+    def rotacion_de_cuentas_por_cobrar_comerciales_y_otras(ventas, promedio):
+        return ventas / promedio
 
-    def rotacion_de_propiedades_planta_equipo(self):
-        promedio_lista = cumulative_mean(self.js.propiedades_planta_equipo)
-        return [
-            ventas / promedio
-            for ventas, promedio in
-            zip(self.js.ventas, promedio_lista)
-        ]
+    @ratio('ventas', Promedio('propiedades_planta_equipo'))
+    def rotacion_de_propiedades_planta_equipo(ventas, promedio):
+        return ventas / promedio
 
-    def rotacion_de_activo_promedio(self):
-        promedio_lista = cumulative_mean(self.js.activo_total)
-        return [
-            ventas / promedio
-            for ventas, promedio in
-            zip(self.js.ventas, promedio_lista)
-        ]
+    @ratio('ventas', Promedio('activo_total'))
+    def rotacion_de_activo_promedio(ventas, promedio):
+        return ventas / promedio
 
 
 @dataclass
 class GenerarResultados:
     file: str
+    vectorizado: bool = True
+    lector: str = 'columnar'
+    propagar_nan: bool = False
+    ventanas: Optional[Dict[str, Union[Ventana, str]]] = None
     """
         Evalúa todos los métodos de todas las clases que se pasen como lista
+
+        lector='columnar' lee Excel, CSV o Parquet directo a arrays.
+        lector='json' mantiene la lectura original de Excel
+        (to_json -> json.loads -> validación de pydantic por elemento)
+
+        propagar_nan=True: una división entre cero no detiene el cálculo,
+        ver Analisis e invalidos()
+
+        ventanas: Ventana de los promedios por ratio, ver Analisis
     """
+    clases_analisis: ClassVar[List[type]] = [
+        AnalisisLiquidez,
+        AnalisisSolvenciaRiesgo,
+        RendimientoOperativo,
+        AnalisisDupont,
+        ExplotacionActivos
+        ]
 
     def __post_init__(self):
-        self.excel = self.excel_reader()
-        self.data = Json(**self.excel)
-        self.AnalisisLiquidez = AnalisisLiquidez(js=self.data)
-        self.AnalisisSolvenciaRiesgo = AnalisisSolvenciaRiesgo(js=self.data)
-        self.RendimientoOperativo = RendimientoOperativo(js=self.data)
-        self.AnalisisDupont = AnalisisDupont(js=self.data)
-        self.ExplotacionActivos = ExplotacionActivos(js=self.data)
+        if self.lector == 'json':
+            with PERFIL.etapa('lectura'):
+                self.excel = self.excel_reader()
+            with PERFIL.etapa('validacion'):
+                self.data = modelo_json()(**self.excel)
+            # Los arrays se construyen una sola vez y se comparten
+            columnas = columnas_numpy(self.data) if self.vectorizado else None
+        else:
+            with PERFIL.etapa('lectura'):
+                self.leidas = self.columnar_reader()
+            columnas = {
+                campo: valores for campo, valores in self.leidas.items()
+                if campo != 'periodo'
+            }
+            if not self.vectorizado:
+                columnas = None
+        # Con columnas los análisis no necesitan Json: en modo columnar
+        # vectorizado data y excel solo se arman si se piden
+        js = self.data if columnas is None or self.lector == 'json' else None
+        opciones = dict(
+            js=js, vectorizado=self.vectorizado, columnas=columnas,
+            propagar_nan=self.propagar_nan, ventanas=self.ventanas
+            )
+        self.AnalisisLiquidez = AnalisisLiquidez(**opciones)
+        self.AnalisisSolvenciaRiesgo = AnalisisSolvenciaRiesgo(**opciones)
+        self.RendimientoOperativo = RendimientoOperativo(**opciones)
+        self.AnalisisDupont = AnalisisDupont(**opciones)
+        self.ExplotacionActivos = ExplotacionActivos(**opciones)
         # Lista de análisis a clasificar
-        self.clases = [
-            AnalisisLiquidez,
-            AnalisisSolvenciaRiesgo,
-            RendimientoOperativo,
-            AnalisisDupont,
-            ExplotacionActivos
-            ]
+        self.clases = self.clases_analisis
+        self.calculos = self.get_calculos()
+
+    @cached_property
+    def excel(self) -> Dict[str, List]:
+        """
+            Columnas leídas como List; con lector='json' se asigna en
+            __post_init__
+        """
+        return {
+            campo: valores.tolist() for campo, valores in self.leidas.items()
+        }
+
+    @cached_property
+    def data(self) -> EstadosFinancieros:
+        """
+            Json armado con las columnas ya validadas por columnar_reader,
+            sin repetir la validación por elemento
+        """
+        with PERFIL.etapa('validacion'):
+            modelo = modelo_json()
+            construir = getattr(modelo, 'model_construct', None)
+            if construir is None:
+                construir = modelo.construct
+            return construir(**self.excel)
+
+    def periodo(self) -> Serie:
+        """
+            Fechas DD-MM-YYYY de cada fila, sin armar Json si no existe
+        """
+        if self.lector == 'json':
+            return self.data.periodo
+        return self.leidas['periodo']
 
     def excel_reader(self) -> Dict[str, List[float]]:
+        import pandas as pd
+
         excel = pd.read_excel(self.file)
         result = excel.to_json(orient="columns")
         parsed = json.loads(result)
@@ -392,29 +1237,44 @@ class GenerarResultados:
 
         return lista
 
+    def columnar_reader(self) -> Dict[str, np.ndarray]:
+        """
+            Lee el archivo y pasa cada columna directo a un array,
+            sin pasar por JSON ni validar elemento por elemento
+        """
+        tabla = leer_tabla(self.file)
+        validar_columnas(tabla)
+        return columnas_tabla(tabla)
+
     @staticmethod
     def get_metodos(clase: any) -> List[str]:
         """
-            Crea una lista con todos los métodos de una clase
+            Lista los ratios registrados de una clase.
+            Se ordenan por nombre para mantener las columnas de calculado.csv
         """
-        return [
-            method for method in dir(clase)
-            if not method.startswith('__')
-            and callable(getattr(clase, method))
-        ]
+        return sorted(ratios_clase(clase))
 
-    def get_resultados(self, clase: str) -> Dict[str, List[float]]:
+    def get_calculos(self) -> Dict[str, List[tuple]]:
         """
-            Crea un Dict con el nombre del método y sus valores.
+            Resuelve una sola vez, por clase, el nombre de cada ratio
+            y su método ya enlazado a la instancia
         """
-        diccionario = {}
-        for metodo in self.get_metodos(clase):
-            diccionario.update({
-                eval(f'self.{clase.__name__}.{metodo}.__name__'):
-                    eval(f'self.{clase.__name__}.{metodo}()')
-            })
+        return {
+            clase.__name__: [
+                (metodo, getattr(getattr(self, clase.__name__), metodo))
+                for metodo in self.get_metodos(clase)
+            ]
+            for clase in self.clases
+        }
 
-        return diccionario
+    def get_resultados(self, clase: type) -> Dict[str, List[float]]:
+        """
+            Crea un Dict con el nombre del método y sus valores.
+        """
+        return {
+            metodo: calcular()
+            for metodo, calcular in self.calculos[clase.__name__]
+        }
 
     def resultados_final(self) -> Dict[str, List[float]]:
         """
@@ -422,18 +1282,1071 @@ class GenerarResultados:
             combina en un solo Dict
         """
         # Se empieza por agregar los valores de Excel
-        diccionario = dict(self.data.copy())
+        diccionario = dict(self.data)
         # Luego los valores calculados
-        for clase in self.clases:
-            diccionario.update(self.get_resultados(clase=clase))
+        with PERFIL.etapa('ratios'):
+            for clase in self.clases:
+                diccionario.update(self.get_resultados(clase=clase))
         return diccionario
 
-    def csv(self):
-        resultados = self.resultados_final()
-        df = pd.DataFrame(resultados)
-        df.to_csv('calculado.csv', index=False)
+    def columnas_resultado(self) -> Iterator[Tuple[str, Serie]]:
+        """
+            Mismas columnas que resultados_final, pero se entregan una a una
+            tal como se calcularon (arrays o List), sin armar un Dict
+        """
+        yield 'periodo', self.periodo()
+        for campo in CAMPOS:
+            if campo != 'periodo':
+                yield campo, self.AnalisisLiquidez.columna(campo)
+        vistos = set()
+        for clase in self.clases:
+            for metodo, calcular in self.calculos[clase.__name__]:
+                if metodo not in vistos:
+                    vistos.add(metodo)
+                    yield metodo, calcular()
+
+    def invalidos(self) -> Dict[str, np.ndarray]:
+        """
+            Máscara por ratio (en el orden de las filas) de las celdas sin
+            un valor finito
+        """
+        invalidos = {}
+        for clase in self.clases:
+            for nombre, mascara in getattr(
+                self, clase.__name__
+            ).invalidos().items():
+                invalidos.setdefault(nombre, mascara)
+        return invalidos
+
+    def guardar(
+        self,
+        salida: str = 'calculado.parquet',
+        formato: Optional[str] = None,
+        float32: bool = False
+    ):
+        # Los ratios se calculan mientras se escribe: quedan dentro de
+        # la etapa escritura
+        with PERFIL.etapa('escritura'):
+            escribir_resultados(
+                self.columnas_resultado(), salida,
+                formato=formato, float32=float32
+                )
+
+    def csv(self, salida: str = 'calculado.csv'):
+        self.guardar(salida, formato='csv')
+
+
+@dataclass
+class GenerarResultadosLote:
+    """
+        Evalúa todos los ratios para varias empresas en una sola pasada.
+        Recibe una tabla larga (una fila por empresa y periodo) que se
+        ordena en arrays 2-D (empresa × periodo); las empresas con menos
+        periodos se completan con NaN al final
+    """
+    tabla: pd.DataFrame
+    columna_empresa: str = 'empresa'
+    propagar_nan: bool = False
+    ventanas: Optional[Dict[str, Union[Ventana, str]]] = None
+
+    def __post_init__(self):
+        validar_columnas(self.tabla, self.columna_empresa)
+        self.empresas, self.periodos, self.columnas, self.valido = (
+            self.matriz()
+        )
+        opciones = dict(
+            js=None, columnas=self.columnas, propagar_nan=self.propagar_nan,
+            ventanas=self.ventanas
+            )
+        self.instancias = [
+            clase(**opciones) for clase in GenerarResultados.clases_analisis
+        ]
+
+    @classmethod
+    def desde_directorio(
+        cls,
+        directorio: str,
+        patron: str = '*.xlsx',
+        **opciones
+    ):
+        """
+            Un workbook por empresa. El nombre del archivo (sin extensión)
+            se usa como identificador de la empresa
+        """
+        import pandas as pd
+
+        tablas = []
+        for file in sorted(Path(directorio).glob(patron)):
+            tabla = leer_tabla(file)
+            tabla.insert(0, 'empresa', file.stem)
+            tablas.append(tabla)
+        if not tablas:
+            raise FileNotFoundError(
+                f'No hay archivos {patron} en {directorio}'
+                )
+        return cls(tabla=pd.concat(tablas, ignore_index=True), **opciones)
+
+    @classmethod
+    def desde_archivo(
+        cls,
+        file: str,
+        columna_empresa: str = 'empresa',
+        **opciones
+    ):
+        """
+            Una sola tabla larga (Excel, CSV o Parquet) con una columna
+            por empresa
+        """
+        return cls(
+            tabla=leer_tabla(file), columna_empresa=columna_empresa,
+            **opciones
+            )
+
+    def matriz(self):
+        """
+            Pasa la tabla larga a arrays 2-D (empresa × periodo).
+            Se respeta el orden de aparición de empresas y periodos
+        """
+        filas, posiciones, empresas, forma = posiciones_empresa(
+            self.tabla, self.columna_empresa
+            )
+
+        valido = np.zeros(forma, dtype=bool)
+        valido[filas, posiciones] = True
+
+        periodos = np.full(forma, None, dtype=object)
+        periodos[filas, posiciones] = formato_periodo(self.tabla['periodo'])
+
+        # Un solo bloque (campo, empresa, periodo); cada columna es una vista
+        bloque = np.full((len(CAMPOS_NUMERICOS), *forma), np.nan)
+        bloque[:, filas, posiciones] = self.tabla[CAMPOS_NUMERICOS].to_numpy(
+            dtype=np.float64
+            ).T
+        columnas = dict(zip(CAMPOS_NUMERICOS, bloque))
+
+        return empresas, periodos, columnas, valido
+
+    def columnas_resultado(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+            Columnas de la tabla final (una fila por empresa y periodo),
+            entregadas una a una
+        """
+        empresa_por_fila = np.broadcast_to(
+            self.empresas[:, None], self.valido.shape
+            )
+        yield self.columna_empresa, empresa_por_fila[self.valido]
+        yield 'periodo', self.periodos[self.valido]
+        for campo, matriz in self.columnas.items():
+            yield campo, matriz[self.valido]
+        vistos = set()
+        for instancia in self.instancias:
+            for metodo in GenerarResultados.get_metodos(type(instancia)):
+                if metodo not in vistos:
+                    vistos.add(metodo)
+                    yield metodo, getattr(instancia, metodo)()[self.valido]
+
+    def invalidos(self) -> Dict[str, np.ndarray]:
+        """
+            Máscara por ratio de las celdas sin un valor finito, en el
+            orden de las filas de resultados_final (sin el relleno)
+        """
+        invalidos = {}
+        for instancia in self.instancias:
+            for nombre, mascara in instancia.invalidos().items():
+                invalidos.setdefault(nombre, mascara[self.valido])
+        return invalidos
+
+    def resultados_final(self) -> pd.DataFrame:
+        """
+            Una fila por empresa y periodo: datos de entrada y ratios
+        """
+        import pandas as pd
+
+        return pd.DataFrame(dict(self.columnas_resultado()))
+
+    def guardar(
+        self,
+        salida: str = 'calculado.parquet',
+        formato: Optional[str] = None,
+        float32: bool = False
+    ):
+        escribir_resultados(
+            self.columnas_resultado(), salida, formato=formato, float32=float32
+            )
+
+    def csv(self, salida: str = 'calculado.csv'):
+        self.guardar(salida, formato='csv')
+
+
+@dataclass
+class GenerarResultadosStream:
+    """
+        Calcula los ratios de tablas muy grandes por bloques de filas y
+        escribe cada bloque en el csv apenas se calcula.
+        Las medias acumuladas (ExplotacionActivos) siguen de un bloque al
+        siguiente: se guarda la suma y el número de filas por empresa.
+        Sin columna_empresa toda la tabla se trata como una sola empresa
+    """
+    file: str
+    salida: str = 'calculado.csv'
+    filas_por_bloque: int = 100_000
+    columna_empresa: Optional[str] = None
+    propagar_nan: bool = False
+
+    def __post_init__(self):
+        self.campos_promedio = campos_promedio()
+        # ratio -> celdas inválidas en los bloques procesados
+        self.conteo_invalidos: Dict[str, int] = {}
+        # empresa -> (suma de cada campo de promedio, número de filas)
+        self.acumulado: Dict[any, Tuple[np.ndarray, int]] = {}
+
+    def empresas_bloque(self, tabla: pd.DataFrame) -> tuple:
+        """
+            Código de empresa de cada fila y las empresas del bloque
+        """
+        import pandas as pd
+
+        if self.columna_empresa is None:
+            return np.zeros(len(tabla), dtype=np.int64), [None]
+        return pd.factorize(tabla[self.columna_empresa])
+
+    def filtrar_bloque(self, tabla: pd.DataFrame) -> pd.DataFrame:
+        """
+            Filas del bloque que se procesan; aquí todas
+        """
+        return tabla
+
+    def promedios_bloque(self, tabla: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+            Media acumulada de cada campo continuando desde los bloques
+            anteriores. La suma previa se agrega a la primera fila de cada
+            empresa, así el resultado es el mismo que sin bloques
+        """
+        import pandas as pd
+
+        codigos, empresas = self.empresas_bloque(tabla)
+        valores = tabla[self.campos_promedio].to_numpy(
+            dtype=np.float64, copy=True
+            )
+        suma_previa = np.zeros((len(empresas), len(self.campos_promedio)))
+        filas_previas = np.zeros(len(empresas), dtype=np.int64)
+        for i, empresa in enumerate(empresas):
+            if empresa in self.acumulado:
+                suma_previa[i], filas_previas[i] = self.acumulado[empresa]
+
+        primeras = pd.Series(codigos).drop_duplicates().index.to_numpy()
+        valores[primeras] += suma_previa[codigos[primeras]]
+        grupos = pd.DataFrame(valores).groupby(codigos, sort=False)
+        # skipna=False: un NaN sigue en la suma (y en acumulado) como en
+        # np.cumsum, así el resultado es el mismo que con la tabla completa
+        suma = grupos.cumsum(skipna=False).to_numpy()
+        filas = grupos.cumcount().to_numpy() + 1 + filas_previas[codigos]
+
+        ultimas = pd.Series(codigos).drop_duplicates(keep='last').index
+        for i in ultimas:
+            self.acumulado[empresas[codigos[i]]] = (suma[i].copy(), filas[i])
+
+        medias = suma / filas[:, None]
+        return {
+            campo: medias[:, j] for j, campo in enumerate(self.campos_promedio)
+        }
+
+    def resultados_bloque(self, tabla: pd.DataFrame) -> pd.DataFrame:
+        import pandas as pd
+
+        extra = () if self.columna_empresa is None else (self.columna_empresa,)
+        validar_columnas(tabla, *extra)
+        columnas = columnas_tabla(tabla)
+        diccionario = {campo: tabla[campo].to_numpy() for campo in extra}
+        diccionario.update(columnas)
+        opciones = dict(
+            js=None, columnas=columnas, promedios=self.promedios_bloque(tabla),
+            propagar_nan=self.propagar_nan
+            )
+        ratios = {}
+        for clase in GenerarResultados.clases_analisis:
+            instancia = clase(**opciones)
+            for metodo in GenerarResultados.get_metodos(clase):
+                ratios[metodo] = getattr(instancia, metodo)()
+        diccionario.update(ratios)
+        if self.propagar_nan:
+            invalidos = contar_invalidos({
+                metodo: ~np.isfinite(valores)
+                for metodo, valores in ratios.items()
+            })
+            for metodo, cantidad in invalidos.items():
+                self.conteo_invalidos[metodo] = (
+                    self.conteo_invalidos.get(metodo, 0) + cantidad
+                    )
+        return pd.DataFrame(diccionario)
+
+    def csv(self) -> int:
+        """
+            Procesa todos los bloques y devuelve el número de filas escritas
+        """
+        self.acumulado.clear()
+        self.conteo_invalidos.clear()
+        return self.procesar(nuevo=True)
+
+    def procesar(self, nuevo: bool) -> int:
+        """
+            Calcula cada bloque y lo escribe en salida. Si nuevo es False
+            las filas se agregan al final del csv existente
+        """
+        total = 0
+        for bloque in leer_bloques(self.file, self.filas_por_bloque):
+            bloque = self.filtrar_bloque(bloque)
+            if bloque.empty:
+                continue
+            resultados = self.resultados_bloque(bloque)
+            encabezado = nuevo and total == 0
+            resultados.to_csv(
+                self.salida,
+                mode='w' if encabezado else 'a',
+                header=encabezado,
+                index=False
+            )
+            total += len(resultados)
+        return total
+
+
+@dataclass
+class GenerarResultadosIncremental(GenerarResultadosStream):
+    """
+        Agrega periodos nuevos (file) al final de un calculado.csv ya
+        existente sin recalcular la historia.
+        El estado de las medias acumuladas (suma y número de filas por
+        empresa) y el último periodo de cada empresa se guardan junto al
+        csv, en <salida>.estado.json, así cada actualización solo procesa
+        las filas nuevas. Las filas con un periodo igual o anterior al
+        último ya agregado se omiten (se cuentan en omitidas), así volver
+        a aplicar el mismo archivo no duplica filas ni sumas
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.estado = Path(self.salida).with_suffix('.estado.json')
+        # empresa -> último periodo agregado (días desde 1970-01-01)
+        self.ultimo_dia: Dict[any, int] = {}
+        self.desde: Dict[any, int] = {}
+        self.omitidas = 0
+
+    def csv(self) -> int:
+        """
+            Agrega las filas nuevas y devuelve cuántas se escribieron
+        """
+        nuevo = not Path(self.salida).exists()
+        if nuevo:
+            self.acumulado.clear()
+            self.ultimo_dia.clear()
+        else:
+            self.cargar_estado()
+        # Se compara con lo guardado antes de este archivo
+        self.desde = dict(self.ultimo_dia)
+        self.omitidas = 0
+        total = self.procesar(nuevo=nuevo)
+        self.guardar_estado()
+        return total
+
+    def filtrar_bloque(self, tabla: pd.DataFrame) -> pd.DataFrame:
+        """
+            Deja solo las filas posteriores al último periodo de su
+            empresa y actualiza ese último periodo
+        """
+        codigos, empresas = self.empresas_bloque(tabla)
+        dias = dias_periodo(tabla['periodo'])
+        minimo = np.iinfo(np.int64).min
+        limite = np.array(
+            [self.desde.get(empresa, minimo) for empresa in empresas],
+            dtype=np.int64
+        )
+        nuevas = dias > limite[codigos]
+        self.omitidas += int((~nuevas).sum())
+
+        ultimos = np.full(len(empresas), minimo)
+        np.maximum.at(ultimos, codigos[nuevas], dias[nuevas])
+        for empresa, ultimo in zip(empresas, ultimos.tolist()):
+            if ultimo != minimo:
+                self.ultimo_dia[empresa] = max(
+                    ultimo, self.ultimo_dia.get(empresa, minimo)
+                    )
+        if nuevas.all():
+            return tabla
+        return tabla[nuevas].reset_index(drop=True)
+
+    def guardar_estado(self):
+        estado = {
+            'campos': self.campos_promedio,
+            'acumulado': [
+                [
+                    empresa.item() if isinstance(empresa, np.generic)
+                    else empresa,
+                    suma.tolist(),
+                    int(filas),
+                    self.ultimo_dia.get(empresa)
+                ]
+                for empresa, (suma, filas) in self.acumulado.items()
+            ]
+        }
+        self.estado.write_text(json.dumps(estado))
+
+    def cargar_estado(self):
+        """
+            Lee el estado guardado. Si el csv existe pero no tiene estado
+            (p. ej. fue creado por GenerarResultados) se reconstruye
+            leyendo el csv una sola vez
+        """
+        self.acumulado.clear()
+        self.ultimo_dia.clear()
+        if not self.estado.exists():
+            self.desde = {}
+            for bloque in leer_bloques(self.salida, self.filas_por_bloque):
+                self.promedios_bloque(self.filtrar_bloque(bloque))
+            return
+
+        estado = json.loads(self.estado.read_text())
+        if estado['campos'] != self.campos_promedio:
+            raise ValueError(
+                f'El estado {self.estado} se guardó con otros campos de '
+                f'promedio: {estado["campos"]}. Se debe recalcular el csv'
+                )
+        for empresa, suma, filas, *ultimo in estado['acumulado']:
+            self.acumulado[empresa] = (np.array(suma), filas)
+            # Los estados anteriores no guardaban el último periodo
+            if ultimo and ultimo[0] is not None:
+                self.ultimo_dia[empresa] = ultimo[0]
+
+
+def resultados_archivo(file: str, propagar_nan: bool = False) -> pd.DataFrame:
+    """
+        Resultados de un solo workbook con la empresa como primera columna.
+        Es una función de módulo para poder enviarla a otro proceso
+    """
+    import pandas as pd
+
+    resultados = pd.DataFrame(GenerarResultados(
+        file=file, propagar_nan=propagar_nan
+        ).resultados_final())
+    resultados.insert(0, 'empresa', Path(file).stem)
+    return resultados
+
+
+@dataclass
+class GenerarResultadosParalelo:
+    """
+        Ejecuta GenerarResultados sobre muchos workbooks en un pool de
+        procesos. Los resultados se juntan en el mismo orden de files.
+        Si un archivo falla se guarda el error en errores y se sigue
+        con los demás
+    """
+    files: List[str]
+    procesos: Optional[int] = None
+    propagar_nan: bool = False
+
+    def __post_init__(self):
+        self.errores: Dict[str, str] = {}
+        self.segundos = 0.0
+
+    @classmethod
+    def desde_directorio(
+        cls,
+        directorio: str,
+        patron: str = '*.xlsx',
+        procesos: Optional[int] = None,
+        propagar_nan: bool = False
+    ):
+        files = [str(file) for file in sorted(Path(directorio).glob(patron))]
+        if not files:
+            raise FileNotFoundError(
+                f'No hay archivos {patron} en {directorio}'
+                )
+        return cls(files=files, procesos=procesos, propagar_nan=propagar_nan)
+
+    @property
+    def archivos_por_segundo(self) -> float:
+        return len(self.files) / self.segundos if self.segundos else 0.0
+
+    def resultados_final(self) -> pd.DataFrame:
+        """
+            Una sola tabla con los resultados de todos los archivos
+            que se procesaron sin errores
+        """
+        import pandas as pd
+
+        self.errores.clear()
+        inicio = time.perf_counter()
+        if self.procesos == 1:
+            tablas = [
+                self.ejecutar(
+                    partial(resultados_archivo, file, self.propagar_nan), file
+                    )
+                for file in self.files
+            ]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+                futuros = [
+                    pool.submit(resultados_archivo, file, self.propagar_nan)
+                    for file in self.files
+                ]
+                tablas = [self.ejecutar(futuro.result, file)
+                          for futuro, file in zip(futuros, self.files)]
+        self.segundos = time.perf_counter() - inicio
+
+        tablas = [tabla for tabla in tablas if tabla is not None]
+        if not tablas:
+            return pd.DataFrame()
+        return pd.concat(tablas, ignore_index=True)
+
+    def ejecutar(
+        self,
+        calculo: Callable[[], pd.DataFrame],
+        file: str
+    ) -> Optional[pd.DataFrame]:
+        """
+            Devuelve el resultado de un archivo o None si falló
+        """
+        try:
+            return calculo()
+        except Exception as error:
+            self.errores[file] = f'{type(error).__name__}: {error}'
+            return None
+
+    def guardar(
+        self,
+        salida: str = 'calculado.parquet',
+        formato: Optional[str] = None,
+        float32: bool = False
+    ):
+        escribir_resultados(
+            self.resultados_final().items(),
+            salida,
+            formato=formato,
+            float32=float32
+        )
+
+    def csv(self, salida: str = 'calculado.csv'):
+        self.resultados_final().to_csv(salida, index=False)
+
+
+def huella_archivo(file: str) -> str:
+    """
+        sha256 del contenido del archivo
+    """
+    resumen = hashlib.sha256()
+    with open(file, 'rb') as archivo:
+        for bloque in iter(partial(archivo.read, 1 << 20), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def version_ratios() -> str:
+    """
+        Huella del conjunto de ratios: nombre, entradas y código de cada
+        fórmula, y los campos de Json. Cambia si se agrega o modifica un
+        ratio, así los resultados guardados con la versión anterior dejan
+        de usarse
+    """
+    resumen = hashlib.sha256(repr(CAMPOS).encode())
+    for categoria in sorted(REGISTRO_RATIOS):
+        for nombre, definicion in sorted(REGISTRO_RATIOS[categoria].items()):
+            codigo = definicion.formula.__code__
+            resumen.update(repr((
+                categoria, nombre, definicion.entradas,
+                codigo.co_code, codigo.co_consts, codigo.co_names
+                )).encode())
+    return resumen.hexdigest()
+
+
+@dataclass
+class CacheResultados:
+    """
+        Cache en disco de los resultados de GenerarResultados.
+        La clave es el contenido del archivo (sha256), la versión de los
+        ratios y las opciones de GenerarResultados; cada entrada es un
+        .npz (<archivo>-<configuración>.npz) en directorio.
+        Si el tamaño total pasa max_bytes se borran las entradas usadas
+        hace más tiempo (LRU, según la fecha de modificación que se
+        actualiza en cada acierto)
+    """
+    directorio: str = '.cache_resultados'
+    max_bytes: int = 512 * 2 ** 20
+
+    def __post_init__(self):
+        self.ruta = Path(self.directorio)
+        self.ruta.mkdir(parents=True, exist_ok=True)
+        self.estadisticas = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+
+    @property
+    def tasa_aciertos(self) -> float:
+        consultas = self.estadisticas['aciertos'] + self.estadisticas['fallos']
+        return self.estadisticas['aciertos'] / consultas if consultas else 0.0
+
+    def entrada(self, file: str, **opciones) -> Path:
+        configuracion = hashlib.sha256(repr((
+            version_ratios(), sorted(opciones.items())
+            )).encode()).hexdigest()
+        return self.ruta / f'{huella_archivo(file)}-{configuracion[:16]}.npz'
+
+    def obtener(self, file: str, **opciones) -> pd.DataFrame:
+        """
+            Resultados de file (mismas columnas que resultados_final),
+            desde la cache o calculados y guardados.
+            opciones se pasan a GenerarResultados
+        """
+        import pandas as pd
+
+        entrada = self.entrada(file, **opciones)
+        try:
+            # Marca el uso para el LRU
+            os.utime(entrada)
+            resultados = leer_resultados(str(entrada))
+        except FileNotFoundError:
+            # No existe o otro proceso la desalojó: cuenta como fallo
+            pass
+        else:
+            self.estadisticas['aciertos'] += 1
+            return resultados
+
+        self.estadisticas['fallos'] += 1
+        generar = GenerarResultados(file=file, **opciones)
+        with PERFIL.etapa('escritura'):
+            columnas = {
+                nombre: np.asarray(valores)
+                for nombre, valores in generar.columnas_resultado()
+            }
+            # Se escribe aparte y se renombra, así otro proceso nunca lee
+            # una entrada a medio escribir
+            temporal = entrada.with_suffix(f'.{os.getpid()}.tmp')
+            escribir_resultados(columnas.items(), str(temporal), 'npz')
+        os.replace(temporal, entrada)
+        self.desalojar()
+        # Se devuelve lo calculado: desalojar puede haber borrado la
+        # entrada (si sola pasa max_bytes) y otro proceso también
+        return pd.DataFrame(columnas)
+
+    def tamano(self) -> int:
+        return sum(entrada.stat().st_size for entrada in self.entradas())
+
+    def entradas(self) -> List[Path]:
+        return list(self.ruta.glob('*.npz'))
+
+    def desalojar(self):
+        """
+            Borra las entradas menos usadas hasta quedar bajo max_bytes
+        """
+        entradas = sorted(
+            ((entrada.stat(), entrada) for entrada in self.entradas()),
+            key=lambda item: item[0].st_mtime
+        )
+        total = sum(estado.st_size for estado, _ in entradas)
+        for estado, entrada in entradas:
+            if total <= self.max_bytes:
+                break
+            entrada.unlink(missing_ok=True)
+            total -= estado.st_size
+            self.estadisticas['desalojos'] += 1
+
+    def invalidar(self, file: Optional[str] = None) -> int:
+        """
+            Borra las entradas de file (todas sus configuraciones) o, sin
+            file, toda la cache. Devuelve cuántas se borraron
+        """
+        patron = '*.npz' if file is None else f'{huella_archivo(file)}-*.npz'
+        borradas = 0
+        for entrada in self.ruta.glob(patron):
+            entrada.unlink(missing_ok=True)
+            borradas += 1
+        return borradas
+
+
+@dataclass
+class AlmacenRatios:
+    """
+        Almacén en disco de resultados (periodo × empresa) por ratio.
+        Cada columna numérica de resultados es un archivo <ratio>.f64 de
+        float64 sin encabezado que se abre con np.memmap; indice.json
+        guarda las empresas, los periodos (días desde 1970-01-01), los
+        ratios y la capacidad reservada de cada eje.
+        Las filas son periodos, así el corte de un periodo (todas las
+        empresas) es una fila contigua y agregar periodos solo extiende
+        los archivos. Las celdas sin datos son NaN.
+        Pensado para un solo proceso que escribe a la vez
+    """
+    directorio: str
+
+    def __post_init__(self):
+        self.ruta = Path(self.directorio)
+        self.ruta.mkdir(parents=True, exist_ok=True)
+        self.indice = self.ruta / 'indice.json'
+        if self.indice.exists():
+            datos = json.loads(self.indice.read_text())
+        else:
+            datos = {
+                'empresas': [], 'dias': [], 'ratios': [],
+                'capacidad_periodos': 0, 'capacidad_empresas': 0
+            }
+        self.empresas: List[str] = datos['empresas']
+        self.dias: List[int] = datos['dias']
+        self.ratios: List[str] = datos['ratios']
+        self.capacidad = (
+            datos['capacidad_periodos'], datos['capacidad_empresas']
+        )
+        self.posicion_empresa = {e: i for i, e in enumerate(self.empresas)}
+        self.posicion_periodo = {d: i for i, d in enumerate(self.dias)}
+        self.abiertos: Dict[str, np.memmap] = {}
+
+    def guardar_indice(self):
+        temporal = self.indice.with_suffix('.tmp')
+        temporal.write_text(json.dumps({
+            'empresas': self.empresas,
+            'dias': self.dias,
+            'ratios': self.ratios,
+            'capacidad_periodos': self.capacidad[0],
+            'capacidad_empresas': self.capacidad[1],
+        }))
+        os.replace(temporal, self.indice)
+
+    def archivo(self, nombre: str) -> Path:
+        return self.ruta / f'{nombre}.f64'
+
+    def abrir(self, nombre: str) -> np.memmap:
+        """
+            Archivo completo del ratio (con la capacidad reservada)
+        """
+        if nombre not in self.abiertos:
+            self.abiertos[nombre] = np.memmap(
+                self.archivo(nombre), dtype=np.float64, mode='r+',
+                shape=self.capacidad
+                )
+        return self.abiertos[nombre]
+
+    def reservar(self, periodos: int, empresas: int):
+        """
+            Agranda la capacidad (al doble) si no alcanza. Más periodos
+            solo extienden cada archivo; más empresas cambian el largo de
+            las filas y obligan a reescribirlos
+        """
+        capacidad_periodos, capacidad_empresas = self.capacidad
+        nueva_periodos, nueva_empresas = self.capacidad
+        while nueva_periodos < periodos:
+            nueva_periodos = max(2 * nueva_periodos, 16)
+        while nueva_empresas < empresas:
+            nueva_empresas = max(2 * nueva_empresas, 16)
+        if (nueva_periodos, nueva_empresas) == self.capacidad:
+            return
+
+        for matriz in self.abiertos.values():
+            matriz.flush()
+        self.abiertos.clear()
+        nueva = (nueva_periodos, nueva_empresas)
+        for nombre in self.ratios:
+            archivo = self.archivo(nombre)
+            if nueva_empresas == capacidad_empresas:
+                with open(archivo, 'r+b') as datos:
+                    datos.truncate(nueva_periodos * nueva_empresas * 8)
+                matriz = np.memmap(
+                    archivo, dtype=np.float64, mode='r+', shape=nueva
+                    )
+                matriz[capacidad_periodos:] = np.nan
+                matriz.flush()
+                continue
+            temporal = archivo.with_suffix('.tmp')
+            matriz = np.memmap(
+                temporal, dtype=np.float64, mode='w+', shape=nueva
+                )
+            matriz[:] = np.nan
+            matriz[:capacidad_periodos, :capacidad_empresas] = np.memmap(
+                archivo, dtype=np.float64, mode='r', shape=self.capacidad
+                )
+            matriz.flush()
+            del matriz
+            os.replace(temporal, archivo)
+        self.capacidad = nueva
+
+    def agregar(
+        self,
+        tabla: pd.DataFrame,
+        columna_empresa: str = 'empresa',
+        empresa: Optional[str] = None
+    ) -> int:
+        """
+            Agrega (o reemplaza) las celdas de una tabla de resultados:
+            una fila por empresa y periodo, 'periodo' y las columnas
+            numéricas. Sin columna_empresa en la tabla se usa empresa.
+            Devuelve el número de filas escritas
+        """
+        import pandas as pd
+
+        if columna_empresa in tabla.columns:
+            empresas = tabla[columna_empresa].astype(str).to_numpy()
+        elif empresa is not None:
+            empresas = np.full(len(tabla), str(empresa), dtype=object)
+        else:
+            raise ValueError(
+                f'La tabla no tiene la columna {columna_empresa!r}, '
+                'indicar empresa'
+                )
+        dias = dias_periodo(tabla['periodo'])
+
+        for nombre in empresas.tolist():
+            if nombre not in self.posicion_empresa:
+                self.posicion_empresa[nombre] = len(self.empresas)
+                self.empresas.append(nombre)
+        for dia in dias.tolist():
+            if dia not in self.posicion_periodo:
+                self.posicion_periodo[dia] = len(self.dias)
+                self.dias.append(dia)
+        self.reservar(len(self.dias), len(self.empresas))
+        # Los archivos ya tienen la nueva capacidad: el índice se guarda
+        # enseguida para que al reabrir las vistas queden alineadas
+        self.guardar_indice()
+
+        filas = np.array([self.posicion_periodo[d] for d in dias.tolist()])
+        columnas = np.array([
+            self.posicion_empresa[e] for e in empresas.tolist()
+        ])
+        for nombre in tabla.columns:
+            if nombre in (columna_empresa, 'periodo'):
+                continue
+            valores = tabla[nombre]
+            if not pd.api.types.is_numeric_dtype(valores):
+                continue
+            if nombre not in self.ratios:
+                matriz = np.memmap(
+                    self.archivo(nombre), dtype=np.float64, mode='w+',
+                    shape=self.capacidad
+                    )
+                matriz[:] = np.nan
+                matriz.flush()
+                self.ratios.append(nombre)
+                self.guardar_indice()
+            self.abrir(nombre)[filas, columnas] = valores.to_numpy(
+                dtype=np.float64
+                )
+        for matriz in self.abiertos.values():
+            matriz.flush()
+        self.guardar_indice()
+        return len(tabla)
+
+    def ratio(self, nombre: str) -> np.ndarray:
+        """
+            Vista sin copia (periodo × empresa) de un ratio
+        """
+        if nombre not in self.ratios:
+            raise KeyError(f'Ratio {nombre!r} no está en el almacén')
+        return self.abrir(nombre)[:len(self.dias), :len(self.empresas)]
+
+    def fechas(self) -> np.ndarray:
+        return np.array(self.dias, dtype=np.int64).view('datetime64[D]')
+
+    def fila_periodo(self, periodo) -> int:
+        """
+            periodo: texto DD-MM-YYYY o ISO, fecha, o un año si en ese año
+            hay un solo periodo
+        """
+        if isinstance(periodo, (int, np.integer)):
+            filas = [
+                i for i, fecha in enumerate(self.fechas().astype(object))
+                if fecha.year == periodo
+            ]
+            if len(filas) != 1:
+                raise KeyError(
+                    f'El año {periodo} tiene {len(filas)} periodos, '
+                    'indicar la fecha'
+                    )
+            return filas[0]
+        if isinstance(periodo, str) and '-' in periodo[:3]:
+            periodo = datetime.strptime(periodo, '%d-%m-%Y').date()
+        dia = int(np.datetime64(periodo, 'D').astype(np.int64))
+        if dia not in self.posicion_periodo:
+            raise KeyError(f'Periodo {periodo} no está en el almacén')
+        return self.posicion_periodo[dia]
+
+    def corte(self, nombre: str, periodo) -> np.ndarray:
+        """
+            Un ratio para todas las empresas en un periodo (vista sin
+            copia, en el orden de empresas)
+        """
+        return self.ratio(nombre)[self.fila_periodo(periodo)]
+
+    def tabla_corte(
+        self,
+        periodo,
+        nombres: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+            Varios ratios para todas las empresas en un periodo
+        """
+        import pandas as pd
+
+        fila = self.fila_periodo(periodo)
+        return pd.DataFrame(
+            {nombre: self.ratio(nombre)[fila]
+             for nombre in nombres or self.ratios},
+            index=pd.Index(self.empresas, name='empresa')
+        )
+
+    def historia(
+        self,
+        empresa: str,
+        nombres: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+            Ratios de una empresa ordenados por periodo (sin los periodos
+            en que la empresa no tiene datos)
+        """
+        import pandas as pd
+
+        columna = self.posicion_empresa[str(empresa)]
+        orden = np.argsort(self.dias, kind='stable')
+        return pd.DataFrame(
+            {nombre: self.ratio(nombre)[orden, columna]
+             for nombre in nombres or self.ratios},
+            index=pd.Index(self.fechas()[orden], name='periodo')
+        ).dropna(how='all')
+
+
+def cli(argv: Optional[List[str]] = None):
+    """
+        Entrada por consola, sin interfaz gráfica:
+            python main.py modelo.xlsx
+            python main.py estados/ --modo paralelo --salida lote.parquet
+        Si no se indica archivo se abre el diálogo de tkinter
+        (solo en equipos con escritorio)
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Calcula los ratios de los estados financieros'
+        )
+    parser.add_argument(
+        'entrada', nargs='?',
+        help='Excel, CSV o Parquet; un directorio en los modos lote '
+             'y paralelo'
+    )
+    parser.add_argument('--salida', default='calculado.csv')
+    parser.add_argument(
+        '--modo', default='unico',
+        choices=('unico', 'lote', 'stream', 'incremental', 'paralelo')
+    )
+    parser.add_argument(
+        '--empresa', default=None,
+        help='Columna con la empresa en tablas largas'
+    )
+    parser.add_argument(
+        '--patron', default='*.xlsx',
+        help='Archivos del directorio en los modos lote y paralelo'
+    )
+    parser.add_argument('--filas', type=int, default=100_000)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--float32', action='store_true')
+    parser.add_argument(
+        '--cache', default=None,
+        help='Directorio de la cache de resultados (solo modo unico)'
+    )
+    parser.add_argument(
+        '--almacen', default=None,
+        help='Directorio de AlmacenRatios donde también se agregan los '
+             'resultados (modos unico, lote y paralelo)'
+    )
+    parser.add_argument(
+        '--nan', action='store_true',
+        help='Las divisiones entre cero dan inf/NaN en lugar de detener '
+             'el cálculo; se informa cuántas celdas quedaron inválidas'
+    )
+    parser.add_argument(
+        '--perfil', default=None,
+        help='Guarda los tiempos por etapa y por ratio '
+             '(.json o formato folded para flame graphs)'
+    )
+    args = parser.parse_args(argv)
+
+    if args.perfil is not None:
+        with PERFIL.activar():
+            ejecutar_cli(args)
+        PERFIL.guardar(args.perfil)
+    else:
+        ejecutar_cli(args)
+
+
+def ejecutar_cli(args):
+    entrada = args.entrada
+    if entrada is None:
+        from tkinter.filedialog import askopenfilename
+
+        entrada = askopenfilename()
+
+    if args.modo in ('stream', 'incremental'):
+        clase = (
+            GenerarResultadosStream if args.modo == 'stream'
+            else GenerarResultadosIncremental
+        )
+        stream = clase(
+            file=entrada,
+            salida=args.salida,
+            filas_por_bloque=args.filas,
+            columna_empresa=args.empresa,
+            propagar_nan=args.nan
+        )
+        stream.csv()
+        informar_invalidos(stream.conteo_invalidos)
+        return
+
+    if args.modo == 'unico' and args.cache is not None:
+        tabla = CacheResultados(args.cache).obtener(
+            entrada, propagar_nan=args.nan
+            )
+        escribir_resultados(tabla.items(), args.salida, float32=args.float32)
+        if args.almacen is not None:
+            AlmacenRatios(args.almacen).agregar(
+                tabla, empresa=Path(entrada).stem
+                )
+        return
+
+    if args.modo == 'unico':
+        resultados = GenerarResultados(file=entrada, propagar_nan=args.nan)
+    elif args.modo == 'lote' and Path(entrada).is_dir():
+        resultados = GenerarResultadosLote.desde_directorio(
+            entrada, patron=args.patron, propagar_nan=args.nan
+            )
+    elif args.modo == 'lote':
+        resultados = GenerarResultadosLote.desde_archivo(
+            entrada, columna_empresa=args.empresa or 'empresa',
+            propagar_nan=args.nan
+            )
+    else:
+        resultados = GenerarResultadosParalelo.desde_directorio(
+            entrada, patron=args.patron, procesos=args.procesos,
+            propagar_nan=args.nan
+            )
+    if args.almacen is None:
+        resultados.guardar(args.salida, float32=args.float32)
+    else:
+        import pandas as pd
+
+        # Se calcula una sola vez para el archivo de salida y el almacén
+        tabla = pd.DataFrame(resultados.resultados_final())
+        escribir_resultados(tabla.items(), args.salida, float32=args.float32)
+        AlmacenRatios(args.almacen).agregar(
+            tabla,
+            columna_empresa=getattr(resultados, 'columna_empresa', 'empresa'),
+            empresa=Path(entrada).stem
+        )
+    if args.nan and args.modo != 'paralelo':
+        informar_invalidos(contar_invalidos(resultados.invalidos()))
+
+    if args.modo == 'paralelo':
+        for file, error in resultados.errores.items():
+            print(f'{file}: {error}', file=sys.stderr)
+        print(f'{resultados.archivos_por_segundo:.1f} archivos/s')
+
+
+def informar_invalidos(conteo: Dict[str, int]):
+    for nombre, cantidad in conteo.items():
+        print(f'{nombre}: {cantidad} celdas inválidas', file=sys.stderr)
 
 
 if __name__ == "__main__":
-    file = askopenfilename()
-    GenerarResultados(file=file).csv()
+    cli()
@@ -0,0 +1,64 @@
+"""
+    Mide la latencia de importación en frío de analisis contable/main.py.
+    Cada medición corre en un intérprete nuevo, así no hay módulos en cache.
+
+        python benchmarks/importacion.py
+        python benchmarks/importacion.py --repeticiones 30 --limite 150
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+MODULO = RAIZ / 'analisis contable'
+PESADOS = ('pandas', 'pydantic', 'tkinter', 'pyarrow', 'openpyxl')
+
+CODIGO = f'''
+import json, sys, time
+sys.path.insert(0, {str(MODULO)!r})
+inicio = time.perf_counter()
+import main
+segundos = time.perf_counter() - inicio
+print(json.dumps({{
+    'ms': segundos * 1000,
+    'cargados': [m for m in {PESADOS!r} if m in sys.modules],
+}}))
+'''
+
+
+def medir(repeticiones: int) -> dict:
+    tiempos, cargados = [], set()
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', CODIGO],
+            capture_output=True, text=True, check=True
+        )
+        medicion = json.loads(salida.stdout)
+        tiempos.append(medicion['ms'])
+        cargados.update(medicion['cargados'])
+    tiempos.sort()
+    return {
+        'repeticiones': repeticiones,
+        'mediana_ms': statistics.median(tiempos),
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(0.95 * len(tiempos)))],
+        'minimo_ms': tiempos[0],
+        'modulos_pesados': sorted(cargados),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticiones', type=int, default=15)
+    parser.add_argument(
+        '--limite', type=float, default=None,
+        help='Falla (código 1) si la mediana supera este valor en ms'
+    )
+    args = parser.parse_args()
+
+    resultado = medir(args.repeticiones)
+    print(json.dumps(resultado, indent=4))
+    if args.limite is not None and resultado['mediana_ms'] > args.limite:
+        sys.exit(1)
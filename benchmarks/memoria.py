@@ -0,0 +1,82 @@
+"""
+    Compara la memoria retenida y el tiempo de construcción/validación de
+    los estados financieros de N empresas × T periodos:
+    un modelo pydantic Json por empresa frente a un solo EstadosCompactos.
+
+        python benchmarks/memoria.py
+        python benchmarks/memoria.py --empresas 10000 --periodos 20
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from rendimiento import contable, datos_empresas  # noqa: E402
+
+
+def medir(construir) -> dict:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objeto = construir()
+    segundos = time.perf_counter() - inicio
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objeto
+    return {
+        'segundos': segundos,
+        'retenido_mb': retenido / 2 ** 20,
+        'pico_mb': pico / 2 ** 20,
+    }
+
+
+def comparar(empresas: int, periodos: int) -> dict:
+    modulo = contable()
+    tabla = datos_empresas(empresas, periodos)
+    Json = modulo.modelo_json()
+    grupos = [grupo for _, grupo in tabla.groupby('empresa', sort=False)]
+
+    def modelos_json():
+        # Mismo dict que produce excel_reader para cada empresa; los
+        # floats de las listas se crean dentro de la medición
+        return [
+            Json(**{
+                campo: (
+                    grupo[campo].tolist() if campo != 'periodo'
+                    else grupo[campo].astype('int64').tolist()
+                )
+                for campo in modulo.CAMPOS
+            })
+            for grupo in grupos
+        ]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        json_pydantic = medir(modelos_json)
+    compactos = medir(
+        lambda: modulo.EstadosCompactos.desde_tabla(
+            tabla, columna_empresa='empresa'
+            )
+        )
+    return {
+        'empresas': empresas,
+        'periodos': periodos,
+        'json_pydantic': json_pydantic,
+        'estados_compactos': compactos,
+        'memoria_x': (
+            json_pydantic['retenido_mb'] / compactos['retenido_mb']
+        ),
+        'tiempo_x': json_pydantic['segundos'] / compactos['segundos'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--empresas', type=int, default=2_000)
+    parser.add_argument('--periodos', type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(comparar(args.empresas, args.periodos), indent=4))
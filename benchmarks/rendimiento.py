@@ -0,0 +1,431 @@
+"""
+    Benchmarks de analisis contable/main.py y finanzas/main.py con datos
+    sintéticos. Para cada caso reporta latencia (mediana, p95, máximo),
+    throughput (unidades por segundo) y memoria pico (tracemalloc).
+
+        python benchmarks/rendimiento.py
+        python benchmarks/rendimiento.py --casos ratios bonos --escala 2
+        python benchmarks/rendimiento.py --guardar
+        python benchmarks/rendimiento.py --comparar --tolerancia 0.25
+
+    --guardar escribe las mediciones en lineas_base.json; --comparar las
+    contrasta con ese archivo y termina con código 1 si algún caso es más
+    lento (o usa más memoria) que la línea base más la tolerancia.
+    Las líneas base solo son comparables en la misma máquina.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+LINEAS_BASE = Path(__file__).resolve().parent / 'lineas_base.json'
+
+
+def cargar(nombre: str, carpeta: str):
+    """
+        Los dos módulos se llaman main.py, así que se cargan por ruta
+        con un nombre propio cada uno
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(
+        nombre, RAIZ / carpeta / 'main.py'
+        )
+    modulo = importlib.util.module_from_spec(spec)
+    # dataclasses busca el módulo en sys.modules
+    sys.modules[nombre] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def contable():
+    return cargar('analisis_contable', 'analisis contable')
+
+
+def finanzas():
+    return cargar('finanzas', 'finanzas')
+
+
+# Generadores de datos sintéticos
+
+def datos_empresas(empresas: int, periodos: int, semilla: int = 0):
+    """
+        Tabla larga con una fila por empresa y periodo y todas las
+        columnas de EstadosFinancieros, sin ceros y con los signos de
+        modelo.xlsx (costos y gastos negativos)
+    """
+    import pandas as pd
+
+    generador = np.random.default_rng(semilla)
+    filas = empresas * periodos
+    tabla = {
+        'empresa': np.repeat(
+            [f'E{i:05d}' for i in range(empresas)], periodos
+            ),
+        # Un periodo por año desde 2000, en Epoch milisegundos
+        'periodo': np.tile(
+            (np.arange(periodos) * 365 + 10_957) * 86_400_000, empresas
+            ),
+    }
+    for campo in contable().CAMPOS:
+        if campo != 'periodo':
+            tabla[campo] = generador.uniform(1e3, 1e6, filas)
+    for campo in contable().CAMPOS_NO_POSITIVOS:
+        tabla[campo] = -tabla[campo]
+    return pd.DataFrame(tabla)
+
+
+def datos_bonos(bonos: int, semilla: int = 0) -> Dict[str, np.ndarray]:
+    generador = np.random.default_rng(semilla)
+    return {
+        'tasa_cupon': generador.uniform(0.01, 0.12, bonos),
+        'valor_nominal': np.full(bonos, 1_000.0),
+        'periodos': generador.integers(1, 40, bonos),
+        'valor_mercado': generador.uniform(700, 1_300, bonos),
+    }
+
+
+def datos_wacc():
+    return finanzas().WACC(
+        acciones_comun_precio=45,
+        acciones_comun_cantidad=43_030_000,
+        prima_mercado=0.105,
+        tasa_impuestos=0.3,
+        tasa_libre_riesgo=0.0525,
+        beta=0.84,
+        acciones_preferente_precio=50,
+        acciones_preferente_cantidad=2_028_000,
+        acciones_dividendo=3,
+        total_mercado_deuda_override=205_107_000,
+        bonos_tir=0.08
+    )
+
+
+def datos_flujo(periodos: int, semilla: int = 0):
+    generador = np.random.default_rng(semilla)
+    return finanzas().FlujoCajaLibre(
+        tasa_crecimiento=0.03,
+        tasa_descuento=0.12,
+        fcl_override=generador.uniform(1e4, 2e4, periodos).tolist()
+    )
+
+
+def datos_acciones(acciones: int, anos: int = 10, semilla: int = 0):
+    generador = np.random.default_rng(semilla)
+    return {
+        'dividendo': generador.uniform(1, 5, acciones),
+        'crecimientos': generador.uniform(0, 0.25, (acciones, anos)),
+        'crecimiento_terminal': generador.uniform(0.01, 0.04, acciones),
+        'tasa_descuento': generador.uniform(0.07, 0.12, acciones),
+    }
+
+
+# Casos
+
+@dataclass
+class Caso:
+    """
+        preparar(escala) arma los datos fuera de la medición y devuelve
+        (función a medir, unidades procesadas por llamada, nombre de la
+        unidad)
+    """
+    nombre: str
+    grupo: str
+    preparar: Callable
+
+
+def caso_ratios_lote(escala: float):
+    tabla = datos_empresas(int(2_000 * escala), 20)
+    lote = contable().GenerarResultadosLote
+
+    def ejecutar():
+        lote(tabla=tabla).resultados_final()
+    return ejecutar, len(tabla), 'filas'
+
+
+def caso_ratios_archivo(escala: float, vectorizado: bool):
+    periodos = int(2_000 * escala)
+    tabla = datos_empresas(1, periodos).drop(columns='empresa')
+    archivo = os.path.join(tempfile.mkdtemp(), 'empresa.csv')
+    tabla.to_csv(archivo, index=False)
+    generar = contable().GenerarResultados
+
+    def ejecutar():
+        generar(archivo, vectorizado=vectorizado).resultados_final()
+    return ejecutar, periodos, 'filas'
+
+
+def caso_ratios_lector(escala: float, lector: str):
+    # lector='json' solo lee Excel
+    periodos = int(500 * escala)
+    tabla = datos_empresas(1, periodos).drop(columns='empresa')
+    carpeta = tempfile.mkdtemp()
+    archivo = os.path.join(carpeta, 'empresa.xlsx')
+    salida = os.path.join(carpeta, 'calculado.csv')
+    tabla.to_excel(archivo, index=False)
+    generar = contable().GenerarResultados
+
+    def ejecutar():
+        generar(archivo, lector=lector).csv(salida)
+    return ejecutar, periodos, 'filas'
+
+
+def caso_bonos_tir(escala: float):
+    bonos = datos_bonos(int(10_000 * escala))
+    tir_bonos = finanzas().tir_bonos
+
+    def ejecutar():
+        tir_bonos(**bonos)
+    return ejecutar, len(bonos['tasa_cupon']), 'bonos'
+
+
+def caso_bonos_tir_escalar(escala: float):
+    bonos = datos_bonos(int(100 * escala))
+    bono = finanzas().Bono
+    argumentos = [
+        dict(zip(bonos, valores))
+        for valores in zip(*(serie.tolist() for serie in bonos.values()))
+    ]
+
+    def ejecutar():
+        for argumento in argumentos:
+            bono(**argumento).tir()
+    return ejecutar, len(argumentos), 'bonos'
+
+
+def caso_cartera_bonos(escala: float):
+    bonos = int(100_000 * escala)
+    generador = np.random.default_rng(0)
+    cartera = finanzas().CarteraBonos(
+        cantidad=generador.integers(1, 1_000, bonos),
+        precio_nominal=np.full(bonos, 1_000.0),
+        precio_mercado=generador.uniform(700, 1_300, bonos),
+        rentabilidad_vencimiento=generador.uniform(0.02, 0.1, bonos)
+    )
+    indices = generador.integers(0, bonos, 1_000)
+    precios = generador.uniform(700, 1_300, 1_000)
+
+    def ejecutar():
+        for indice, precio in zip(indices.tolist(), precios.tolist()):
+            cartera.actualizar_precio(indice, precio)
+            cartera.costo_deuda()
+    return ejecutar, len(indices), 'actualizaciones'
+
+
+def caso_wacc_escenarios(escala: float):
+    wacc = datos_wacc()
+    lado = int(100 * escala ** 0.5)
+    variaciones = dict(
+        beta=np.linspace(0.5, 1.5, lado),
+        prima_mercado=np.linspace(0.05, 0.12, lado),
+        tasa_impuestos=np.linspace(0.2, 0.4, 10),
+        total_mercado_deuda=np.linspace(1e8, 4e8, 10)
+    )
+
+    def ejecutar():
+        wacc.escenarios(**variaciones)
+    return ejecutar, lado * lado * 100, 'escenarios'
+
+
+def caso_fcl_sensibilidad(escala: float):
+    flujo = datos_flujo(30)
+    lado = int(500 * escala ** 0.5)
+    tasas_descuento = np.linspace(0.08, 0.2, lado)
+    tasas_crecimiento = np.linspace(0.0, 0.05, lado)
+
+    def ejecutar():
+        flujo.sensibilidad(tasas_descuento, tasas_crecimiento)
+    return ejecutar, lado * lado, 'escenarios'
+
+
+def caso_fcl_montecarlo(escala: float):
+    simulaciones = int(100_000 * escala)
+    simulacion = finanzas().MonteCarlo(
+        flujo=datos_flujo(10),
+        volatilidad={'utilidad_operativa': 0.1, 'tasa_descuento': 0.01},
+        simulaciones=simulaciones,
+        semilla=0
+    )
+
+    def ejecutar():
+        simulacion.simular()
+    return ejecutar, simulaciones, 'simulaciones'
+
+
+def caso_acciones_ddm(escala: float):
+    acciones = datos_acciones(int(100_000 * escala))
+    ddm_multietapa = finanzas().ddm_multietapa
+
+    def ejecutar():
+        ddm_multietapa(**acciones)
+    return ejecutar, len(acciones['dividendo']), 'acciones'
+
+
+CASOS = [
+    Caso('ratios_lote', 'ratios', caso_ratios_lote),
+    Caso('ratios_archivo_vectorizado', 'ratios',
+         lambda escala: caso_ratios_archivo(escala, True)),
+    Caso('ratios_archivo_lista', 'ratios',
+         lambda escala: caso_ratios_archivo(escala, False)),
+    Caso('ratios_lector_json', 'ratios',
+         lambda escala: caso_ratios_lector(escala, 'json')),
+    Caso('ratios_lector_columnar', 'ratios',
+         lambda escala: caso_ratios_lector(escala, 'columnar')),
+    Caso('bonos_tir', 'bonos', caso_bonos_tir),
+    Caso('bonos_tir_escalar', 'bonos', caso_bonos_tir_escalar),
+    Caso('cartera_bonos', 'bonos', caso_cartera_bonos),
+    Caso('wacc_escenarios', 'wacc', caso_wacc_escenarios),
+    Caso('fcl_sensibilidad', 'fcl', caso_fcl_sensibilidad),
+    Caso('fcl_montecarlo', 'fcl', caso_fcl_montecarlo),
+    Caso('acciones_ddm', 'acciones', caso_acciones_ddm),
+]
+
+
+# Medición
+
+def percentil(valores: List[float], q: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(q * len(valores)))]
+
+
+def medir(caso: Caso, escala: float, repeticiones: int) -> dict:
+    ejecutar, unidades, unidad = caso.preparar(escala)
+    # Calentamiento: imports perezosos, caches, etc.
+    ejecutar()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        ejecutar()
+        tiempos.append(time.perf_counter() - inicio)
+
+    # La memoria se mide aparte, tracemalloc agrega overhead al tiempo
+    tracemalloc.start()
+    ejecutar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mediana = statistics.median(tiempos)
+    return {
+        'grupo': caso.grupo,
+        'escala': escala,
+        'unidades': unidades,
+        'unidad': unidad,
+        'repeticiones': repeticiones,
+        'mediana_ms': mediana * 1000,
+        'p95_ms': percentil(tiempos, 0.95) * 1000,
+        'maximo_ms': max(tiempos) * 1000,
+        'throughput': unidades / mediana,
+        'memoria_pico_mb': pico / 2 ** 20,
+    }
+
+
+def ejecutar_casos(
+    nombres: Optional[List[str]],
+    escala: float,
+    repeticiones: int
+) -> Dict[str, dict]:
+    seleccion = [
+        caso for caso in CASOS
+        if not nombres or caso.nombre in nombres or caso.grupo in nombres
+    ]
+    if not seleccion:
+        raise SystemExit(f'No hay casos para {nombres}')
+    resultados = {}
+    for caso in seleccion:
+        resultados[caso.nombre] = medir(caso, escala, repeticiones)
+        fila = resultados[caso.nombre]
+        print(
+            f'{caso.nombre:<28} {fila["mediana_ms"]:>10.2f} ms '
+            f'p95 {fila["p95_ms"]:>10.2f} ms '
+            f'{fila["throughput"]:>14,.0f} {fila["unidad"]}/s '
+            f'{fila["memoria_pico_mb"]:>9.1f} MB',
+            file=sys.stderr
+        )
+    return resultados
+
+
+def comparar(
+    actual: Dict[str, dict],
+    base: Dict[str, dict],
+    tolerancia: float
+) -> List[str]:
+    """
+        Imprime actual / base por caso y devuelve los casos que empeoraron
+        más que la tolerancia (tiempo o memoria).
+        Solo se comparan casos medidos con la misma escala
+    """
+    regresiones = []
+    print(f'{"caso":<28} {"tiempo":>9} {"memoria":>9}')
+    for nombre, fila in actual.items():
+        if nombre not in base:
+            print(f'{nombre:<28} {"(sin línea base)":>19}')
+            continue
+        if fila['escala'] != base[nombre]['escala']:
+            print(f'{nombre:<28} {"(otra escala)":>19}')
+            continue
+        tiempo = fila['mediana_ms'] / base[nombre]['mediana_ms']
+        memoria = (
+            fila['memoria_pico_mb']
+            / max(base[nombre]['memoria_pico_mb'], 1e-9)
+        )
+        marca = ''
+        if tiempo > 1 + tolerancia or memoria > 1 + tolerancia:
+            regresiones.append(nombre)
+            marca = '  <- regresión'
+        print(f'{nombre:<28} {tiempo:>8.2f}x {memoria:>8.2f}x{marca}')
+    return regresiones
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--casos', nargs='*',
+        help='Nombres de casos o grupos: '
+        + ', '.join(sorted({caso.grupo for caso in CASOS}))
+    )
+    parser.add_argument('--escala', type=float, default=1.0)
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--guardar', action='store_true')
+    parser.add_argument('--comparar', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=0.3)
+    parser.add_argument('--lineas-base', type=Path, default=LINEAS_BASE)
+    args = parser.parse_args()
+
+    resultados = ejecutar_casos(args.casos, args.escala, args.repeticiones)
+
+    if args.comparar:
+        base = json.loads(args.lineas_base.read_text())['casos']
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            sys.exit(1)
+    else:
+        print(json.dumps(resultados, indent=4))
+
+    if args.guardar:
+        casos = {}
+        if args.lineas_base.exists():
+            casos = json.loads(args.lineas_base.read_text())['casos']
+        casos.update(resultados)
+        # La escala se guarda en cada caso: --guardar puede mezclar
+        # casos medidos con escalas distintas
+        args.lineas_base.write_text(json.dumps({
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'maquina': platform.machine(),
+            'casos': casos,
+        }, indent=4) + '\n')
@@ -1,9 +1,145 @@
-from dataclasses import dataclass
-from typing import List, Optional, Union
+import os
+import sys
+from dataclasses import asdict, dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
 import numpy_financial as npf
 import matplotlib.pyplot as plt
 
 
+def cargar_perfil():
+    """
+        perfil.py está en la raíz del repositorio, compartido por
+        analisis contable y finanzas. Se carga por ruta, sin tocar
+        sys.path; si ya se cargó se reutiliza el mismo módulo
+    """
+    import importlib.util
+
+    nombre = 'finanzas_economia_perfil'
+    if nombre not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            nombre, Path(__file__).resolve().parent.parent / 'perfil.py'
+            )
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules[nombre] = modulo
+        spec.loader.exec_module(modulo)
+    return sys.modules[nombre]
+
+
+PerfilBase = cargar_perfil().Perfil
+
+
+# Parámetros de WACC que se pueden variar en WACC.escenarios
+PARAMETROS_ESCENARIO = (
+    'acciones_comun_precio',
+    'acciones_comun_cantidad',
+    'prima_mercado',
+    'tasa_impuestos',
+    'tasa_libre_riesgo',
+    'beta',
+    'acciones_preferente_precio',
+    'acciones_preferente_cantidad',
+    'acciones_dividendo',
+    'total_mercado_deuda',
+    'costo_deuda',
+)
+
+
+@dataclass
+class CarteraBonos:
+    """
+        Cartera de bonos de un emisor guardada por columnas (arrays).
+        Los totales (valor nominal, valor de mercado y mercado ×
+        rentabilidad) se calculan una vez y se mantienen al actualizar
+        precios, así K_d no vuelve a recorrer toda la cartera
+    """
+    cantidad: List[float]
+    precio_nominal: List[float]
+    precio_mercado: List[float]
+    rentabilidad_vencimiento: Optional[List[float]] = None
+
+    def __post_init__(self):
+        self.cantidad = np.array(self.cantidad, dtype=np.float64)
+        self.precio_nominal = np.array(self.precio_nominal, dtype=np.float64)
+        self.precio_mercado = np.array(self.precio_mercado, dtype=np.float64)
+        if self.rentabilidad_vencimiento is not None:
+            self.rentabilidad_vencimiento = np.array(
+                self.rentabilidad_vencimiento, dtype=np.float64
+                )
+        self.recalcular()
+
+    def recalcular(self):
+        """
+            Vuelve a sumar toda la cartera
+        """
+        self.total_nominal = float(self.cantidad @ self.precio_nominal)
+        mercado = self.cantidad * self.precio_mercado
+        self.total_mercado = float(mercado.sum())
+        self.mercado_por_rentabilidad = (
+            None if self.rentabilidad_vencimiento is None
+            else float(mercado @ self.rentabilidad_vencimiento)
+        )
+
+    def actualizar_precio(
+        self,
+        indice: Union[int, List[int]],
+        precio_mercado: Union[float, List[float]],
+        rentabilidad_vencimiento: Optional[Union[float, List[float]]] = None
+    ):
+        """
+            Cambia el precio (y la rentabilidad) de uno o varios bonos.
+            Solo se ajustan los totales con la diferencia de esos bonos.
+            Después de muchas actualizaciones se puede usar recalcular()
+            para eliminar el error de redondeo acumulado.
+            Si un índice se repite queda el último valor, igual que al
+            asignar en un array
+        """
+        indice = np.atleast_1d(indice)
+        precio_mercado = np.broadcast_to(precio_mercado, indice.shape)
+        if rentabilidad_vencimiento is not None:
+            rentabilidad_vencimiento = np.broadcast_to(
+                rentabilidad_vencimiento, indice.shape
+                )
+        if indice.size > 1:
+            # Cada bono se ajusta una sola vez, con su última posición
+            indice = np.where(indice < 0, indice + self.cantidad.size, indice)
+            _, desde_el_final = np.unique(indice[::-1], return_index=True)
+            ultimos = indice.size - 1 - desde_el_final
+            indice = indice[ultimos]
+            precio_mercado = precio_mercado[ultimos]
+            if rentabilidad_vencimiento is not None:
+                rentabilidad_vencimiento = rentabilidad_vencimiento[ultimos]
+        cantidad = self.cantidad[indice]
+        mercado_anterior = cantidad * self.precio_mercado[indice]
+        mercado_nuevo = cantidad * precio_mercado
+
+        self.total_mercado += float((mercado_nuevo - mercado_anterior).sum())
+        if self.mercado_por_rentabilidad is not None:
+            rentabilidad_anterior = self.rentabilidad_vencimiento[indice]
+            rentabilidad_nueva = (
+                rentabilidad_anterior if rentabilidad_vencimiento is None
+                else rentabilidad_vencimiento
+            )
+            self.mercado_por_rentabilidad += float((
+                mercado_nuevo * rentabilidad_nueva
+                - mercado_anterior * rentabilidad_anterior
+            ).sum())
+            self.rentabilidad_vencimiento[indice] = rentabilidad_nueva
+        self.precio_mercado[indice] = precio_mercado
+
+    def costo_deuda(self, total_mercado_deuda: Optional[float] = None):
+        """
+            K_d: rentabilidad al vencimiento ponderada por el valor de
+            mercado de cada bono, sobre total_mercado_deuda (por defecto
+            el valor de mercado de la cartera)
+        """
+        if total_mercado_deuda is None:
+            total_mercado_deuda = self.total_mercado
+        return self.mercado_por_rentabilidad / total_mercado_deuda
+
+
 @dataclass
 class WACC:
     """
@@ -30,8 +166,11 @@ class WACC:
     bonos_total_nominal_override: Optional[List[float]] = None
     bonos_total_mercado_override: Optional[List[float]] = None
     total_mercado_deuda_override: Optional[float] = None
+    cartera_bonos: Optional[CarteraBonos] = None
 
     def total_bonos_nominal(self) -> Union[float, List[float]]:
+        if self.cartera_bonos is not None:
+            return self.cartera_bonos.total_nominal
         if self.bonos_total_nominal_override is None:
             valores = []
             for cantidad, precio in zip(
@@ -44,6 +183,8 @@ class WACC:
             return sum(self.bonos_total_nominal_override)
 
     def total_bonos_mercado(self) -> Union[float, List[float]]:
+        if self.cartera_bonos is not None:
+            return self.cartera_bonos.total_mercado
         if self.bonos_total_mercado_override is None:
             valores = []
             for cantidad, precio in zip(
@@ -107,14 +248,19 @@ class WACC:
             Se puede calcular mediante dos formas: 1) La cartera de bonos y
             su rentabilidad al vencimiento o 2) el TIR de un bono de referencia
         """
+        if (
+            self.cartera_bonos is not None
+            and self.cartera_bonos.rentabilidad_vencimiento is not None
+        ):
+            return self.cartera_bonos.costo_deuda(self.total_mercado_deuda())
         if self.bonos_rentabilidad_vencimiento is not None:
+            deuda = self.total_mercado_deuda()
             valores = []
             for mercado, rentabilidad in zip(
                 self.bonos_total_mercado_override,
                 self.bonos_rentabilidad_vencimiento
             ):
-                valores.append(mercado * rentabilidad
-                               / self.total_mercado_deuda())
+                valores.append(mercado * rentabilidad / deuda)
             return sum(valores)
         else:
             return self.bonos_tir
@@ -133,55 +279,195 @@ class WACC:
         return 1 - self.tasa_impuestos
 
     def resultado(self) -> float:
-        return (
-            (self.total_mercado_accion_comun()
-             / self.total_mercado_empresa())
-            * self.costo_patrimonio()
-            + (self.total_mercado_accion_preferente()
-               / self.total_mercado_empresa())
-            * self.costo_acciones_preferentes()
-            + (self.total_mercado_deuda()
-               / self.total_mercado_empresa())
-            * self.costo_deuda()
-        ) * self.escudo_fiscal()
-
-    def estructura_financiera(self):
+        return self.calcular().resultado
+
+    def escenarios(
+        self,
+        cartesiano: bool = True,
+        **variaciones: List[float]
+    ) -> Dict[str, np.ndarray]:
+        """
+            Evalúa el WACC para muchos valores de los parámetros a la vez.
+            Los parámetros que no se pasan se toman de la instancia.
+            Se pueden variar los campos de acciones, prima_mercado,
+            tasa_impuestos, tasa_libre_riesgo, beta y también
+            total_mercado_deuda (D, estructura de capital) y
+            costo_deuda (K_d).
+            cartesiano=True: cada parámetro es un eje de la grilla, en el
+            orden en que se pasan -> forma (n1, n2, ...)
+            cartesiano=False: los arrays se combinan elemento a elemento
+        """
+        desconocidos = set(variaciones) - set(PARAMETROS_ESCENARIO)
+        if desconocidos:
+            raise ValueError(
+                f'Parámetros no soportados: {sorted(desconocidos)}'
+                )
+
+        valores = {}
+        for eje, (nombre, serie) in enumerate(variaciones.items()):
+            serie = np.asarray(serie, dtype=np.float64)
+            if cartesiano:
+                forma = [1] * len(variaciones)
+                forma[eje] = serie.size
+                serie = serie.reshape(forma)
+            valores[nombre] = serie
+
+        def parametro(nombre, defecto):
+            if nombre in valores:
+                return valores[nombre]
+            return defecto() if callable(defecto) else defecto
+
+        accion_comun = (
+            parametro('acciones_comun_precio', self.acciones_comun_precio)
+            * parametro(
+                'acciones_comun_cantidad', self.acciones_comun_cantidad
+                )
+        )
+        precio_preferente = parametro(
+            'acciones_preferente_precio', self.acciones_preferente_precio or 0
+            )
+        accion_preferente = precio_preferente * parametro(
+            'acciones_preferente_cantidad',
+            self.acciones_preferente_cantidad or 0
+        )
+        deuda = parametro('total_mercado_deuda', self.total_mercado_deuda)
+        empresa = accion_comun + accion_preferente + deuda
+
+        costo_patrimonio = (
+            parametro('tasa_libre_riesgo', self.tasa_libre_riesgo)
+            + parametro('beta', self.beta)
+            * parametro('prima_mercado', self.prima_mercado)
+        )
+        # Sin acciones preferentes K_p = 0, igual que la versión escalar
+        precio_preferente = np.asarray(precio_preferente, dtype=np.float64)
+        dividendo = np.asarray(
+            parametro('acciones_dividendo', self.acciones_dividendo or 0),
+            dtype=np.float64
+        )
+        forma = np.broadcast_shapes(dividendo.shape, precio_preferente.shape)
+        costo_acciones_preferentes = np.divide(
+            dividendo,
+            precio_preferente,
+            out=np.zeros(forma),
+            where=np.broadcast_to(precio_preferente != 0, forma)
+        )
+        costo_deuda = parametro('costo_deuda', self.costo_deuda)
+        escudo_fiscal = 1 - parametro('tasa_impuestos', self.tasa_impuestos)
+
+        resultados = {
+            'costo_patrimonio': costo_patrimonio,
+            'costo_deuda': costo_deuda,
+            'costo_acciones_preferentes': costo_acciones_preferentes,
+            'peso_accion_comun': accion_comun / empresa,
+            'peso_accion_preferente': accion_preferente / empresa,
+            'peso_deuda': deuda / empresa,
+            'escudo_fiscal': escudo_fiscal,
+        }
+        resultados['resultado'] = (
+            resultados['peso_accion_comun'] * costo_patrimonio
+            + resultados['peso_accion_preferente'] * costo_acciones_preferentes
+            + resultados['peso_deuda'] * costo_deuda
+        ) * escudo_fiscal
+
+        forma = np.broadcast_shapes(*(
+            np.shape(valor) for valor in resultados.values()
+        ))
+        return {
+            nombre: np.broadcast_to(valor, forma)
+            for nombre, valor in resultados.items()
+        }
+
+    def calcular(self) -> 'ResultadoWACC':
+        """
+            Todos los componentes del WACC en una sola evaluación
+        """
         accion_comun = self.total_mercado_accion_comun()
         accion_preferente = self.total_mercado_accion_preferente()
         deuda = self.total_mercado_deuda()
-        empresa = self.total_mercado_empresa()
+        empresa = accion_comun + accion_preferente + deuda
+        costo_patrimonio = self.costo_patrimonio()
+        costo_deuda = self.costo_deuda()
+        costo_acciones_preferentes = self.costo_acciones_preferentes()
+        escudo_fiscal = self.escudo_fiscal()
+        return ResultadoWACC(
+            accion_comun=accion_comun,
+            accion_preferente=accion_preferente,
+            deuda=deuda,
+            empresa=empresa,
+            costo_patrimonio=costo_patrimonio,
+            costo_deuda=costo_deuda,
+            costo_acciones_preferentes=costo_acciones_preferentes,
+            escudo_fiscal=escudo_fiscal,
+            resultado=(
+                (accion_comun / empresa) * costo_patrimonio
+                + (accion_preferente / empresa) * costo_acciones_preferentes
+                + (deuda / empresa) * costo_deuda
+            ) * escudo_fiscal
+        )
+
+    def estructura_financiera(
+        self,
+        resultado: Optional['ResultadoWACC'] = None
+    ):
+        print((resultado or self.calcular()).texto_estructura())
+
+    def presentacion(self, resultado: Optional['ResultadoWACC'] = None):
+        print((resultado or self.calcular()).texto())
+
 
-        print(f'{"Estructura financiera":-^70}')
-        print(
+@dataclass
+class ResultadoWACC:
+    """
+        Resultado de WACC.calcular. como_dict() es serializable a JSON
+    """
+    accion_comun: float
+    accion_preferente: float
+    deuda: float
+    empresa: float
+    costo_patrimonio: float
+    costo_deuda: float
+    costo_acciones_preferentes: float
+    escudo_fiscal: float
+    resultado: float
+
+    def como_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    def texto_estructura(self) -> str:
+        lineas = [
+            f'{"Estructura financiera":-^70}',
             f'Valor de mercado de las acciones comunes (E) '
-            f'({accion_comun / empresa * 100:.2f}%): '
-            f'{accion_comun:,}'
-        )
-        if self.total_mercado_accion_preferente() != 0:
-            print(
+            f'({self.accion_comun / self.empresa * 100:.2f}%): '
+            f'{self.accion_comun:,}'
+        ]
+        if self.accion_preferente != 0:
+            lineas.append(
                 f'Valor de mercado de las acciones preferentes (P) '
-                f'({accion_preferente / empresa * 100:.2f}%): '
-                f'{accion_preferente:,}'
+                f'({self.accion_preferente / self.empresa * 100:.2f}%): '
+                f'{self.accion_preferente:,}'
             )
-        print(
-            f'Valor de la deuda total (D) ({deuda / empresa * 100:.2f}%): '
-            f'{deuda:,}'
+        lineas.append(
+            f'Valor de la deuda total (D) '
+            f'({self.deuda / self.empresa * 100:.2f}%): '
+            f'{self.deuda:,}'
         )
-        print(f'Valor de mercado de la empresa (V): {empresa:,}')
+        lineas.append(f'Valor de mercado de la empresa (V): {self.empresa:,}')
+        return '\n'.join(lineas)
 
-    def presentacion(self):
-        print(f'{"Resultados":-^70}')
-        print(
-            f'Costo del patrimonio (K_e): {self.costo_patrimonio() * 100:.2f}%'
-            )
-        print(f'Costo de la deuda (K_d): {self.costo_deuda() * 100:.2f}%')
-        if self.total_mercado_accion_preferente() != 0:
-            print(
+    def texto(self) -> str:
+        lineas = [
+            f'{"Resultados":-^70}',
+            f'Costo del patrimonio (K_e): {self.costo_patrimonio * 100:.2f}%',
+            f'Costo de la deuda (K_d): {self.costo_deuda * 100:.2f}%'
+        ]
+        if self.accion_preferente != 0:
+            lineas.append(
                 f'Costo de las acciones preferentes (K_p): '
-                f'{self.costo_acciones_preferentes() * 100:.2f}%'
+                f'{self.costo_acciones_preferentes * 100:.2f}%'
             )
-        print(f'Escudo fiscal: {self.escudo_fiscal() * 100:.2f}%')
-        print(f'Valor WACC: {self.resultado() * 100:.2f}%')
+        lineas.append(f'Escudo fiscal: {self.escudo_fiscal * 100:.2f}%')
+        lineas.append(f'Valor WACC: {self.resultado * 100:.2f}%')
+        return '\n'.join(lineas)
 
 
 @dataclass
@@ -210,6 +496,204 @@ class Bono:
         return npf.irr(flujo)
 
 
+def precio_bonos(
+    tasa: np.ndarray,
+    tasa_cupon: np.ndarray,
+    valor_nominal: np.ndarray,
+    periodos: np.ndarray
+) -> tuple:
+    """
+        Precio de los bonos para una tasa por periodo y su derivada,
+        con la fórmula cerrada de la anualidad:
+            P = C * (1 - v^n) / y + N * v^n,   v = 1 / (1 + y)
+        Se usa expm1/log1p para no perder precisión con y cercano a 0
+    """
+    cupon = valor_nominal * tasa_cupon
+    log_v = -np.log1p(tasa)
+    v_n = np.exp(periodos * log_v)
+    cerca_de_cero = np.abs(tasa) < 1e-10
+    y = np.where(cerca_de_cero, 1.0, tasa)
+    anualidad = np.where(
+        cerca_de_cero, periodos, -np.expm1(periodos * log_v) / y
+        )
+    derivada_anualidad = np.where(
+        cerca_de_cero,
+        -periodos * (periodos + 1) / 2,
+        (periodos * v_n / (1 + y) - anualidad) / y
+    )
+    precio = cupon * anualidad + valor_nominal * v_n
+    derivada = (
+        cupon * derivada_anualidad
+        - periodos * valor_nominal * v_n / (1 + tasa)
+    )
+    return precio, derivada
+
+
+@dataclass
+class ResultadoTIR:
+    """
+        TIR de varios bonos y los datos de convergencia de cada uno
+    """
+    tir: np.ndarray
+    iteraciones: np.ndarray
+    convergio: np.ndarray
+    # precio calculado con la TIR - valor de mercado
+    residuo: np.ndarray
+
+
+def tir_bonos(
+    tasa_cupon: List[float],
+    valor_nominal: List[float],
+    periodos: List[int],
+    valor_mercado: List[float],
+    tolerancia: float = 1e-12,
+    max_iteraciones: int = 100,
+    tolerancia_precio: float = 1e-8
+) -> ResultadoTIR:
+    """
+        Misma TIR que Bono.tir pero para todos los bonos a la vez.
+        Newton con la derivada de la fórmula cerrada del precio; si un paso
+        sale del intervalo donde está la raíz se usa bisección.
+        El precio baja con la tasa, así que la raíz es única.
+        Un bono convergió si el intervalo contiene la raíz, el paso es
+        menor que tolerancia y |residuo| <= tolerancia_precio *
+        valor_mercado. valor_mercado debe ser positivo
+    """
+    tasa_cupon, valor_nominal, periodos, valor_mercado = np.broadcast_arrays(
+        *(np.asarray(valores, dtype=np.float64) for valores in
+          (tasa_cupon, valor_nominal, periodos, valor_mercado))
+    )
+    if not (valor_mercado > 0).all():
+        raise ValueError('valor_mercado debe ser mayor que cero')
+    forma = valor_mercado.shape
+
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        # Intervalo inicial: precio(bajo) > mercado > precio(alto).
+        # bajo se acerca a -1 (-1 + 2^-k) y alto se duplica
+        bajo = np.full(forma, -0.99)
+        alto = np.ones(forma)
+        for _ in range(64):
+            precio, _ = precio_bonos(bajo, tasa_cupon, valor_nominal, periodos)
+            afuera = precio < valor_mercado
+            if not afuera.any():
+                break
+            bajo = np.where(afuera, -1 + (bajo + 1) / 2, bajo)
+        for _ in range(64):
+            precio, _ = precio_bonos(alto, tasa_cupon, valor_nominal, periodos)
+            afuera = precio > valor_mercado
+            if not afuera.any():
+                break
+            alto = np.where(afuera, alto * 2, alto)
+        encerrada = (
+            (precio_bonos(bajo, tasa_cupon, valor_nominal, periodos)[0]
+             >= valor_mercado)
+            & (precio_bonos(alto, tasa_cupon, valor_nominal, periodos)[0]
+               <= valor_mercado)
+        )
+
+        tasa = np.clip(tasa_cupon, bajo, alto)
+        iteraciones = np.zeros(forma, dtype=np.int64)
+        convergio = ~encerrada
+        for _ in range(max_iteraciones):
+            precio, derivada = precio_bonos(
+                tasa, tasa_cupon, valor_nominal, periodos
+                )
+            diferencia = precio - valor_mercado
+            bajo = np.where(diferencia > 0, tasa, bajo)
+            alto = np.where(diferencia > 0, alto, tasa)
+
+            newton = tasa - diferencia / derivada
+            dentro = np.isfinite(newton) & (newton > bajo) & (newton < alto)
+            nueva = np.where(dentro, newton, (bajo + alto) / 2)
+
+            paso = np.abs(nueva - tasa)
+            tasa = np.where(convergio, tasa, nueva)
+            iteraciones += ~convergio
+            convergio |= paso <= tolerancia * (1 + np.abs(tasa))
+            if convergio.all():
+                break
+
+        precio, _ = precio_bonos(tasa, tasa_cupon, valor_nominal, periodos)
+    residuo = precio - valor_mercado
+    # Los bonos sin intervalo válido solo se marcaron para no iterarlos
+    convergio &= encerrada & (
+        np.abs(residuo) <= tolerancia_precio * valor_mercado
+        )
+    return ResultadoTIR(
+        tir=tasa,
+        iteraciones=iteraciones,
+        convergio=convergio,
+        residuo=residuo
+    )
+
+
+@dataclass
+class ValorDDM:
+    """
+        Resultado de ddm_multietapa: valor = valor_dividendos + valor_terminal
+    """
+    valor: np.ndarray
+    # Valor presente de los dividendos de la etapa explícita
+    valor_dividendos: np.ndarray
+    # Valor presente del valor de Gordon al final de la etapa explícita
+    valor_terminal: np.ndarray
+
+
+def ddm_multietapa(
+    dividendo: Union[float, List[float]],
+    crecimientos: Union[List[float], List[List[float]]],
+    crecimiento_terminal: Union[float, List[float]],
+    tasa_descuento: Union[float, List[float]]
+) -> ValorDDM:
+    """
+        Modelo de descuento de dividendos en varias etapas para muchas
+        acciones a la vez.
+        dividendo, crecimiento_terminal y tasa_descuento: uno por acción
+        crecimientos: (acciones, años) o (años,) si es el mismo calendario
+        Los dividendos (D_t = D_0 · Π(1 + g_s)) y los factores de descuento
+        ((1 + r)^-t) se arman con productos acumulados sobre los años
+    """
+    dividendo = np.asarray(dividendo, dtype=np.float64)
+    crecimientos = np.asarray(crecimientos, dtype=np.float64)
+    crecimiento_terminal = np.asarray(crecimiento_terminal, dtype=np.float64)
+    tasa_descuento = np.asarray(tasa_descuento, dtype=np.float64)
+
+    forma = np.broadcast_shapes(
+        dividendo.shape,
+        crecimientos.shape[:-1],
+        crecimiento_terminal.shape,
+        tasa_descuento.shape
+    )
+    anos = crecimientos.shape[-1]
+    unos = np.ones(forma + (1,))
+    # Año 0 incluido, así el último valor existe aunque no haya etapa
+    dividendos = dividendo[..., None] * np.concatenate(
+        [unos, np.cumprod(1 + np.broadcast_to(crecimientos, forma + (anos,)),
+                          axis=-1)],
+        axis=-1
+    )
+    descuento = np.concatenate(
+        [unos, np.cumprod(
+            np.broadcast_to(1 / (1 + tasa_descuento[..., None]),
+                            forma + (anos,)),
+            axis=-1
+        )],
+        axis=-1
+    )
+
+    valor_dividendos = (dividendos[..., 1:] * descuento[..., 1:]).sum(axis=-1)
+    valor_terminal = (
+        dividendos[..., -1] * (1 + crecimiento_terminal)
+        / (tasa_descuento - crecimiento_terminal)
+        * descuento[..., -1]
+    )
+    return ValorDDM(
+        valor=valor_dividendos + valor_terminal,
+        valor_dividendos=valor_dividendos,
+        valor_terminal=valor_terminal
+    )
+
+
 @dataclass
 class AccionComun:
     """
@@ -241,32 +725,67 @@ class AccionComun:
         """
             Genera una lista pronóstico del valor de la acción
         """
-        lista = []
-        for tasa in self.tasa_crecimiento_lista:
-            lista.append(
-                self.dividendo_esperado *
-                ((1 + self.tasa_crecimiento) ** self.periodo)
-                / (self.tasa_descuento - tasa))
-        return lista
+        # El numerador no depende de la tasa, se calcula una vez
+        numerador = (
+            self.dividendo_esperado *
+            ((1 + self.tasa_crecimiento) ** self.periodo)
+        )
+        tasas = np.asarray(self.tasa_crecimiento_lista, dtype=np.float64)
+        # Igual que la versión con float: una tasa igual a la de
+        # descuento lanza ZeroDivisionError
+        try:
+            with np.errstate(divide='raise', invalid='raise'):
+                valores = numerador / (self.tasa_descuento - tasas)
+        except FloatingPointError as error:
+            raise ZeroDivisionError(str(error)) from error
+        return valores.tolist()
 
-    def grafico(self):
+    def valor_multietapa(self, crecimientos: List[float]) -> float:
+        """
+            Valor con una etapa de crecimiento explícito (crecimientos,
+            una tasa por año) y luego crecimiento constante
+            (tasa_crecimiento, Gordon). dividendo_esperado es el último
+            dividendo pagado. Sin etapa explícita es igual a valor()
+            con periodo=1
+        """
+        return float(ddm_multietapa(
+            dividendo=self.dividendo_esperado,
+            crecimientos=crecimientos,
+            crecimiento_terminal=self.tasa_crecimiento,
+            tasa_descuento=self.tasa_descuento
+        ).valor)
+
+    def dibujar(self, ax):
+        """
+            Dibuja el pronóstico en los ejes ax
+        """
         x = self.pronostico()
         y = self.tasa_crecimiento_lista
 
-        plt.plot(x, y, label='Valor')
+        ax.plot(x, y, label='Valor')
 
         # personalización del gráfico
-        plt.xlabel('Precio de la acción')
-        plt.ylabel('Tasa de crecimientio')
-        plt.title('Pronóstico de la acción')
-        plt.legend()
+        ax.set_xlabel('Precio de la acción')
+        ax.set_ylabel('Tasa de crecimientio')
+        ax.set_title('Pronóstico de la acción')
+        ax.legend()
+
+    def grafico(self, archivo: Optional[str] = None):
+        """
+            Sin archivo muestra el gráfico (pyplot); con archivo lo
+            guarda sin ventana
+        """
+        if archivo is not None:
+            Lienzo().guardar(self.dibujar, archivo)
+            return
+        self.dibujar(plt.gca())
         # mostrar el gráfico
         plt.show()
 
     @staticmethod
-    def grafico_flujo(flujo: List[float]):
+    def dibujar_flujo(ax, flujo: List[float]):
         """
-            Esta función permite tomar un flujo y plotearlo
+            Dibuja el flujo en los ejes ax
         """
         # datos del flujo de ingresos
         ingresos = flujo
@@ -274,15 +793,15 @@ class AccionComun:
         tiempo = list(range(1, len(flujo)+1))
 
         # crear la gráfica de líneas
-        plt.plot(tiempo, ingresos, linestyle='--', marker='o', color='blue')
+        ax.plot(tiempo, ingresos, linestyle='--', marker='o', color='blue')
         # etiquetar los ejes
-        plt.xlabel('Año')
-        plt.ylabel('Dividendo')
-        plt.title('Flujo de los dividendos')
+        ax.set_xlabel('Año')
+        ax.set_ylabel('Dividendo')
+        ax.set_title('Flujo de los dividendos')
 
         # agregar etiquetas de valor a la gráfica
         for i, ingreso in enumerate(ingresos):
-            plt.text(
+            ax.text(
                 tiempo[i],
                 ingreso,
                 str(ingreso),
@@ -291,17 +810,89 @@ class AccionComun:
                 fontsize=16
                 )
         # personalizar la apariencia de la gráfica
-        plt.xticks(tiempo)
-        plt.yticks(ingresos)
-        plt.grid(True)
+        ax.set_xticks(tiempo)
+        ax.set_yticks(ingresos)
+        ax.grid(True)
+
+    @staticmethod
+    def grafico_flujo(flujo: List[float], archivo: Optional[str] = None):
+        """
+            Esta función permite tomar un flujo y plotearlo.
+            Con archivo lo guarda sin ventana
+        """
+        if archivo is not None:
+            Lienzo().guardar(
+                lambda ax: AccionComun.dibujar_flujo(ax, flujo), archivo
+                )
+            return
+        AccionComun.dibujar_flujo(plt.gca(), flujo)
         # mostrar la gráfica
         plt.show()
 
-    def presentacion(self):
+    def presentacion(
+        self,
+        graficar: bool = True,
+        archivo: Optional[str] = None
+    ):
         print(f'Valor de la acción (año {self.periodo-1}): {self.valor():.2f}')
         print(f'Pronóstico según tasas de crecimiento: {self.pronostico()}')
         print(f'Ganancia de capital: {self.ganancia_capital():.2f}')
-        self.grafico()
+        if graficar:
+            self.grafico(archivo=archivo)
+
+
+class Lienzo:
+    """
+        Figura con canvas Agg (sin pyplot ni ventana) que se reutiliza
+        para guardar muchos gráficos: solo se limpian los ejes entre uno
+        y otro
+    """
+    def __init__(self, dpi: int = 100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.figura = Figure(dpi=dpi)
+        FigureCanvasAgg(self.figura)
+        self.ax = self.figura.add_subplot()
+
+    def guardar(self, dibujar: Callable, archivo: str) -> str:
+        self.ax.clear()
+        dibujar(self.ax)
+        self.figura.savefig(archivo)
+        return archivo
+
+
+def _graficos_lote(trabajos: List[Tuple[AccionComun, str]]) -> List[str]:
+    lienzo = Lienzo()
+    return [lienzo.guardar(accion.dibujar, archivo)
+            for accion, archivo in trabajos]
+
+
+def graficos_pronostico(
+    acciones: Dict[str, AccionComun],
+    directorio: str = '.',
+    formato: str = 'png',
+    procesos: int = 1
+) -> List[str]:
+    """
+        Guarda el pronóstico de cada acción en
+        directorio/<ticker>.<formato>, sin ventanas. Con procesos > 1 las
+        acciones se reparten en grupos, cada proceso con su propio lienzo
+    """
+    os.makedirs(directorio, exist_ok=True)
+    trabajos = [
+        (accion, os.path.join(directorio, f'{ticker}.{formato}'))
+        for ticker, accion in acciones.items()
+    ]
+    if procesos == 1 or len(trabajos) < 2:
+        return _graficos_lote(trabajos)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    grupos = [trabajos[i::procesos] for i in range(procesos)]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        list(pool.map(_graficos_lote, grupos))
+    return [archivo for _, archivo in trabajos]
 
 
 @dataclass
@@ -358,51 +949,363 @@ class FlujoCajaLibre:
             del flc
             Las tasa de descuento puede ser el WACC también
         """
-        return (
-            self.fcl()[-1] * (1 + self.tasa_crecimiento)
-            / (self.tasa_descuento - self.tasa_crecimiento)
-        )
+        return self._valor_residual(self.fcl())
 
     def vna(self) -> float:
         """
             VNA de una empresa solo considerando los periodos del FCL
         """
-        return npf.npv(rate=self.tasa_descuento, values=self.fcl())
+        return self._vna(self.fcl())
 
     def vna_valor_residual(self) -> float:
         """
             VNA de una empresa considerando su valor residual
         """
+        fcl = self.fcl()
+        return self._vna_valor_residual(fcl, self._valor_residual(fcl))
+
+    def _valor_residual(self, fcl: List[float]) -> float:
+        return (
+            fcl[-1] * (1 + self.tasa_crecimiento)
+            / (self.tasa_descuento - self.tasa_crecimiento)
+        )
+
+    def _vna(self, fcl: List[float]) -> float:
+        return npf.npv(rate=self.tasa_descuento, values=fcl)
+
+    def _vna_valor_residual(
+        self,
+        fcl: List[float],
+        valor_residual: float
+    ) -> float:
         # por metodología e decuenta el valor reidual dentro
         # del valor del último flujo de caja
-        add_valor_residual = self.fcl().copy()
-        # add_valor_residual.append(self.valor_residual())
-        add_valor_residual[-1] = add_valor_residual[-1] + self.valor_residual()
+        add_valor_residual = fcl.copy()
+        add_valor_residual[-1] = add_valor_residual[-1] + valor_residual
         return npf.npv(rate=self.tasa_descuento, values=add_valor_residual)
 
-    def presentacion(self):
-        vna = self.vna()
-        vna_valor_residual = self.vna_valor_residual()
-        vna_perpetuidad = vna_valor_residual - vna
+    def sensibilidad(
+        self,
+        tasas_descuento: List[float],
+        tasas_crecimiento: List[float]
+    ) -> 'Sensibilidad':
+        """
+            VNA y VNA con valor residual para todas las combinaciones de
+            tasa de descuento × tasa de crecimiento.
+            El FCL se calcula una sola vez y los factores de descuento
+            (1 + r)^-t se arman como una matriz tasa × periodo.
+            Si r == g el valor residual queda inf
+        """
+        fcl = np.asarray(self.fcl(), dtype=np.float64)
+        tasas_descuento = np.asarray(tasas_descuento, dtype=np.float64)
+        tasas_crecimiento = np.asarray(tasas_crecimiento, dtype=np.float64)
+
+        factores = 1 / (1 + tasas_descuento[:, None]) ** np.arange(fcl.size)
+        # Igual que npf.npv para cada tasa
+        vna = (fcl * factores).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            valor_residual = (
+                fcl[-1] * (1 + tasas_crecimiento[None, :])
+                / (tasas_descuento[:, None] - tasas_crecimiento[None, :])
+            )
+        # El valor residual se descuenta dentro del último flujo
+        vna_valor_residual = (
+            vna[:, None] + valor_residual * factores[:, -1:]
+        )
+        return Sensibilidad(
+            tasas_descuento=tasas_descuento,
+            tasas_crecimiento=tasas_crecimiento,
+            vna=vna,
+            valor_residual=valor_residual,
+            vna_valor_residual=vna_valor_residual
+        )
+
+    def calcular(self) -> 'ResultadoFCL':
+        """
+            FCL, valor residual y VNA en una sola evaluación: el FCL se
+            calcula una vez
+        """
         fcl = self.fcl()
+        valor_residual = self._valor_residual(fcl)
+        vna = self._vna(fcl)
+        vna_valor_residual = self._vna_valor_residual(fcl, valor_residual)
+        return ResultadoFCL(
+            fcl=fcl,
+            valor_residual=valor_residual,
+            vna=vna,
+            vna_valor_residual=vna_valor_residual,
+            vna_perpetuidad=vna_valor_residual - vna
+        )
+
+    def presentacion(self, resultado: Optional['ResultadoFCL'] = None):
+        print((resultado or self.calcular()).texto())
 
-        print(f'{"Resultados":-^70}')
-        print(f'Flujo de caja libre: {fcl}')
-        print(f'Valor residual (perpetuidad): {self.valor_residual():,}')
-        print(f'Valor Presente del FCL: {vna:,}')
-        print(
+
+@dataclass
+class ResultadoFCL:
+    """
+        Resultado de FlujoCajaLibre.calcular. como_dict() es serializable
+        a JSON
+    """
+    fcl: List[float]
+    valor_residual: float
+    vna: float
+    vna_valor_residual: float
+    vna_perpetuidad: float
+
+    def como_dict(self) -> Dict[str, Union[float, List[float]]]:
+        return asdict(self)
+
+    def texto(self) -> str:
+        anos = len(self.fcl) - 1
+        return '\n'.join([
+            f'{"Resultados":-^70}',
+            f'Flujo de caja libre: {self.fcl}',
+            f'Valor residual (perpetuidad): {self.valor_residual:,}',
+            f'Valor Presente del FCL: {self.vna:,}',
             f'Valor Presente del FCL (con el valor residual): '
-            f'{vna_valor_residual:,}'
+            f'{self.vna_valor_residual:,}',
+            f'{"VNA del FCL":-^70}',
+            f'Periodo Pronosticado ({anos} años) '
+            f'({self.vna/self.vna_valor_residual * 100:.2f}%): {self.vna:,}',
+            f'Perpetuidad (>{anos} años) '
+            f'({self.vna_perpetuidad/self.vna_valor_residual * 100:.2f}%): '
+            f'{self.vna_perpetuidad:,}'
+        ])
+
+
+@dataclass
+class Sensibilidad:
+    """
+        Resultado de FlujoCajaLibre.sensibilidad.
+        Las matrices tienen forma (tasas_descuento, tasas_crecimiento)
+    """
+    tasas_descuento: np.ndarray
+    tasas_crecimiento: np.ndarray
+    # El VNA solo depende de la tasa de descuento
+    vna: np.ndarray
+    valor_residual: np.ndarray
+    vna_valor_residual: np.ndarray
+
+    def tabla(self):
+        """
+            Tabla ordenada (una fila por combinación de tasas), lista para
+            un heatmap, p. ej. tabla().pivot(index='tasa_descuento',
+            columns='tasa_crecimiento', values='vna_valor_residual')
+        """
+        import pandas as pd
+
+        forma = self.vna_valor_residual.shape
+        return pd.DataFrame({
+            'tasa_descuento': np.repeat(self.tasas_descuento, forma[1]),
+            'tasa_crecimiento': np.tile(self.tasas_crecimiento, forma[0]),
+            'vna': np.repeat(self.vna, forma[1]),
+            'valor_residual': self.valor_residual.ravel(),
+            'vna_valor_residual': self.vna_valor_residual.ravel(),
+        })
+
+
+# Variables que se simulan en MonteCarlo, en el orden de la correlación
+VARIABLES_SIMULACION = (
+    'utilidad_operativa',
+    'capex',
+    'cambio_capital_trabajo',
+    'tasa_crecimiento',
+    'tasa_descuento',
+)
+
+
+@dataclass
+class ResultadoMonteCarlo:
+    """
+        Valores de cada simulación. Las simulaciones con tasa de descuento
+        menor o igual a la de crecimiento quedan en NaN (sin valor residual)
+    """
+    vna: np.ndarray
+    vna_valor_residual: np.ndarray
+    valor_accion: Optional[np.ndarray] = None
+
+    def resumen(
+        self,
+        cuantiles: tuple = (0.05, 0.25, 0.5, 0.75, 0.95)
+    ) -> Dict[str, Dict[str, float]]:
+        resultados = {
+            'vna': self.vna,
+            'vna_valor_residual': self.vna_valor_residual,
+        }
+        if self.valor_accion is not None:
+            resultados['valor_accion'] = self.valor_accion
+
+        resumen = {}
+        for nombre, valores in resultados.items():
+            resumen[nombre] = {
+                'media': float(np.nanmean(valores)),
+                'desviacion': float(np.nanstd(valores)),
+                'invalidas': int(np.isnan(valores).sum()),
+                **{
+                    f'p{cuantil * 100:g}': float(valor)
+                    for cuantil, valor in zip(
+                        cuantiles, np.nanquantile(valores, cuantiles)
+                    )
+                }
+            }
+        return resumen
+
+
+@dataclass
+class MonteCarlo:
+    """
+        Simulación de FlujoCajaLibre (y opcionalmente AccionComun.valor).
+        volatilidad indica la desviación estándar de cada variable de
+        VARIABLES_SIMULACION:
+            utilidad_operativa, capex y cambio_capital_trabajo: relativa,
+            cada periodo se multiplica por (1 + volatilidad * z)
+            tasa_crecimiento y tasa_descuento: absoluta, se suma
+            volatilidad * z (la acción usa los mismos choques de tasas)
+        Con fcl_override el choque de utilidad_operativa se aplica al FCL.
+        correlacion es la matriz entre las variables (identidad si es None).
+        Se simula por bloques de filas para acotar la memoria; cada bloque
+        tiene su propio generador derivado de semilla, así el resultado es
+        el mismo con uno o varios procesos
+    """
+    flujo: FlujoCajaLibre
+    volatilidad: Dict[str, float]
+    accion: Optional[AccionComun] = None
+    correlacion: Optional[List[List[float]]] = None
+    simulaciones: int = 100_000
+    bloque: int = 10_000
+    semilla: Optional[int] = None
+    procesos: int = 1
+
+    def __post_init__(self):
+        desconocidas = set(self.volatilidad) - set(VARIABLES_SIMULACION)
+        if desconocidas:
+            raise ValueError(
+                f'Variables no soportadas: {sorted(desconocidas)}'
+                )
+        self.sigma = np.array([
+            self.volatilidad.get(variable, 0.0)
+            for variable in VARIABLES_SIMULACION
+        ])
+        correlacion = (
+            np.eye(len(VARIABLES_SIMULACION)) if self.correlacion is None
+            else np.asarray(self.correlacion, dtype=np.float64)
+        )
+        self.cholesky = np.linalg.cholesky(correlacion)
+
+    def componentes(self) -> np.ndarray:
+        """
+            Flujos base por periodo: utilidad operativa (o FCL con
+            override), depreciación, capex, cambio de capital de trabajo
+            e impuesto, como matriz de 5 × periodos
+        """
+        if self.flujo.fcl_override is not None:
+            fcl = np.asarray(self.flujo.fcl_override, dtype=np.float64)
+            ceros = np.zeros_like(fcl)
+            return np.stack([fcl, ceros, ceros, ceros, ceros])
+        return np.stack(np.broadcast_arrays(*(
+            np.asarray(valores, dtype=np.float64) for valores in (
+                self.flujo.utilidad_operativa,
+                self.flujo.depreciacion_amortizacion,
+                self.flujo.capex,
+                self.flujo.cambio_capital_trabajo,
+                self.flujo.impuesto_renta,
+            )
+        )))
+
+    def simular_bloque(
+        self,
+        semilla: np.random.SeedSequence,
+        n: int
+    ) -> ResultadoMonteCarlo:
+        generador = np.random.default_rng(semilla)
+        utilidad, depreciacion, capex, cct, renta = self.componentes()
+        periodos = utilidad.size
+
+        # Choques correlacionados: (n, periodos, variables)
+        z = generador.standard_normal(
+            (n, periodos, len(VARIABLES_SIMULACION))
+            ) @ self.cholesky.T
+        choque = 1 + self.sigma[:3] * z[:, :, :3]
+        fcl = (
+            utilidad * choque[:, :, 0]
+            + depreciacion
+            - capex * choque[:, :, 1]
+            - cct * choque[:, :, 2]
+            - renta
+        )
+        tasa_crecimiento = (
+            self.flujo.tasa_crecimiento + self.sigma[3] * z[:, 0, 3]
         )
-        print(f'{"VNA del FCL":-^70}')
-        print(
-            f'Periodo Pronosticado ({len(fcl)-1} años) '
-            f'({vna/vna_valor_residual * 100:.2f}%): {vna:,}'
+        tasa_descuento = (
+            self.flujo.tasa_descuento + self.sigma[4] * z[:, 0, 4]
         )
-        print(
-            f'Perpetuidad (>{len(fcl)-1} años) '
-            f'({vna_perpetuidad/vna_valor_residual * 100:.2f}%): '
-            f'{vna_perpetuidad:,}'
+
+        # Misma corrección que _fcl_correccion_npv: si el primer flujo es
+        # negativo se reemplaza por cero, sino todo se corre un periodo
+        negativo = fcl[:, 0] < 0
+        fcl[negativo, 0] = 0
+        exponente = np.arange(periodos) + np.where(negativo, 0, 1)[:, None]
+        factores = (1 + tasa_descuento[:, None]) ** -exponente
+        vna = (fcl * factores).sum(axis=1)
+
+        valido = tasa_descuento > tasa_crecimiento
+        with np.errstate(divide='ignore', invalid='ignore'):
+            valor_residual = np.where(
+                valido,
+                fcl[:, -1] * (1 + tasa_crecimiento)
+                / (tasa_descuento - tasa_crecimiento),
+                np.nan
+            )
+        vna_valor_residual = vna + valor_residual * factores[:, -1]
+
+        valor_accion = None
+        if self.accion is not None:
+            crecimiento = (
+                self.accion.tasa_crecimiento + self.sigma[3] * z[:, 0, 3]
+            )
+            descuento = (
+                self.accion.tasa_descuento + self.sigma[4] * z[:, 0, 4]
+            )
+            with np.errstate(divide='ignore', invalid='ignore'):
+                valor_accion = np.where(
+                    descuento > crecimiento,
+                    self.accion.dividendo_esperado
+                    * (1 + crecimiento) ** self.accion.periodo
+                    / (descuento - crecimiento),
+                    np.nan
+                )
+        return ResultadoMonteCarlo(
+            vna=vna,
+            vna_valor_residual=vna_valor_residual,
+            valor_accion=valor_accion
+        )
+
+    def simular(self) -> ResultadoMonteCarlo:
+        tamanos = [self.bloque] * (self.simulaciones // self.bloque)
+        if self.simulaciones % self.bloque:
+            tamanos.append(self.simulaciones % self.bloque)
+        semillas = np.random.SeedSequence(self.semilla).spawn(len(tamanos))
+
+        if self.procesos == 1:
+            bloques = list(map(self.simular_bloque, semillas, tamanos))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+                bloques = list(
+                    pool.map(self.simular_bloque, semillas, tamanos)
+                    )
+
+        return ResultadoMonteCarlo(
+            vna=np.concatenate([b.vna for b in bloques]),
+            vna_valor_residual=np.concatenate(
+                [b.vna_valor_residual for b in bloques]
+                ),
+            valor_accion=(
+                None if self.accion is None
+                else np.concatenate([b.valor_accion for b in bloques])
+            )
         )
 
 
@@ -437,8 +1340,110 @@ class Roi:
         """
         return self.baidt() / self.vcpi
 
-    def presentacion(self):
-        print(f'TIN: {self.tin()} ')
-        print(f'Inversión neta: {self.inversion_neta()}')
-        print(f'BAIDT: {self.baidt()} ')
-        print(f'ROI: {self.valor_roi()} ')
+    def calcular(self) -> 'ResultadoRoi':
+        """
+            Todos los indicadores en una sola evaluación
+        """
+        inversion_neta = self.inversion_neta()
+        tin = inversion_neta / self.flujo_caja
+        baidt = inversion_neta / tin
+        return ResultadoRoi(
+            tin=tin,
+            inversion_neta=inversion_neta,
+            baidt=baidt,
+            valor_roi=baidt / self.vcpi
+        )
+
+    def presentacion(self, resultado: Optional['ResultadoRoi'] = None):
+        print((resultado or self.calcular()).texto())
+
+
+@dataclass
+class ResultadoRoi:
+    """
+        Resultado de Roi.calcular. como_dict() es serializable a JSON
+    """
+    tin: float
+    inversion_neta: float
+    baidt: float
+    valor_roi: float
+
+    def como_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    def texto(self) -> str:
+        return '\n'.join([
+            f'TIN: {self.tin} ',
+            f'Inversión neta: {self.inversion_neta}',
+            f'BAIDT: {self.baidt} ',
+            f'ROI: {self.valor_roi} '
+        ])
+
+
+class Perfil(PerfilBase):
+    """
+        Tiempos y cantidad de llamadas de cada método de los modelos
+        (CLASES_PERFIL) y de las funciones de FUNCIONES_PERFIL, opcional.
+        Los métodos se envuelven solo mientras el perfil está activo: al
+        salir de activar() se restauran los originales, así desactivado
+        no agrega ningún costo.
+        Los registros, el resumen y la exportación son los de perfil.py
+
+            with PERFIL.activar():
+                WACC(...).presentacion()
+            PERFIL.guardar('perfil.json')     # o 'perfil.folded'
+    """
+    def __init__(self):
+        self.originales: List[tuple] = []
+        super().__init__()
+
+    def medir(self, funcion: Callable, nombre: str) -> Callable:
+        @wraps(funcion)
+        def medida(*args, **kwargs):
+            with self.etapa(nombre):
+                return funcion(*args, **kwargs)
+        return medida
+
+    def instalar(self):
+        for clase in CLASES_PERFIL:
+            for nombre, valor in list(vars(clase).items()):
+                if nombre.startswith('_'):
+                    continue
+                etiqueta = f'{clase.__name__}.{nombre}'
+                if isinstance(valor, staticmethod):
+                    medida = staticmethod(
+                        self.medir(valor.__func__, etiqueta)
+                        )
+                elif callable(valor):
+                    medida = self.medir(valor, etiqueta)
+                else:
+                    continue
+                self.originales.append((clase, nombre, valor))
+                setattr(clase, nombre, medida)
+        # Las funciones se buscan en el módulo al llamarlas
+        modulo = globals()
+        for nombre in FUNCIONES_PERFIL:
+            self.originales.append((None, nombre, modulo[nombre]))
+            modulo[nombre] = self.medir(modulo[nombre], nombre)
+
+    def restaurar(self):
+        for clase, nombre, valor in reversed(self.originales):
+            if clase is None:
+                globals()[nombre] = valor
+            else:
+                setattr(clase, nombre, valor)
+        self.originales.clear()
+
+
+CLASES_PERFIL = (
+    CarteraBonos,
+    WACC,
+    Bono,
+    AccionComun,
+    FlujoCajaLibre,
+    MonteCarlo,
+    Roi,
+)
+FUNCIONES_PERFIL = ('precio_bonos', 'tir_bonos', 'ddm_multietapa')
+
+PERFIL = Perfil()
@@ -0,0 +1,130 @@
+"""
+    Perfil de tiempos compartido por analisis contable/main.py y
+    finanzas/main.py: registros por pila de etapas, resumen y exportación
+    a JSON o al formato folded de los flame graphs.
+    Cada módulo decide qué se mide: analisis contable marca sus etapas con
+    PERFIL.etapa() y finanzas envuelve los métodos de sus modelos
+"""
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+class Perfil:
+    """
+        Tiempos y cantidad de llamadas por etapa, opcional.
+        Las etapas se anidan: cada registro se guarda con la pila completa
+        (p. ej. ('escritura', 'AnalisisDupont.roe',
+        'AnalisisDupont.margen_neto')), así se puede exportar como
+        flame graph. Desactivado solo cuesta revisar activo.
+        instalar() y restaurar() se llaman al entrar y salir de activar();
+        aquí no hacen nada
+    """
+    def __init__(self):
+        self.activo = False
+        self.reiniciar()
+
+    def reiniciar(self):
+        # pila -> [segundos, segundos propios, llamadas]
+        self.registros: Dict[Tuple[str, ...], List[float]] = {}
+        self.pila: List[str] = []
+
+    def instalar(self):
+        pass
+
+    def restaurar(self):
+        pass
+
+    @contextmanager
+    def activar(self, reiniciar: bool = True):
+        if self.activo:
+            yield self
+            return
+        if reiniciar:
+            self.reiniciar()
+        self.instalar()
+        self.activo = True
+        try:
+            yield self
+        finally:
+            self.activo = False
+            self.restaurar()
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        if not self.activo:
+            yield
+            return
+        self.pila.append(nombre)
+        clave = tuple(self.pila)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self.pila.pop()
+            registro = self.registros.setdefault(clave, [0.0, 0.0, 0])
+            registro[0] += segundos
+            registro[1] += segundos
+            registro[2] += 1
+            if self.pila:
+                # El tiempo de la etapa hija no es propio de la madre
+                self.registros.setdefault(
+                    tuple(self.pila), [0.0, 0.0, 0]
+                    )[1] -= segundos
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """
+            Totales por nombre de etapa, sin importar desde dónde se llamó
+        """
+        totales: Dict[str, Dict[str, float]] = {}
+        for pila, (segundos, propios, llamadas) in self.registros.items():
+            total = totales.setdefault(
+                pila[-1], {'segundos': 0.0, 'propios': 0.0, 'llamadas': 0}
+                )
+            # Si la etapa ya está más arriba en la pila (recursión) su
+            # tiempo ya se contó ahí
+            if pila[-1] not in pila[:-1]:
+                total['segundos'] += segundos
+            total['propios'] += propios
+            total['llamadas'] += llamadas
+        return dict(sorted(
+            totales.items(), key=lambda item: -item[1]['segundos']
+            ))
+
+    def como_dict(self) -> dict:
+        return {
+            'resumen': self.resumen(),
+            'pilas': [
+                {
+                    'pila': list(pila),
+                    'segundos': segundos,
+                    'propios': propios,
+                    'llamadas': llamadas
+                }
+                for pila, (segundos, propios, llamadas)
+                in self.registros.items()
+            ],
+        }
+
+    def folded(self) -> str:
+        """
+            Formato 'pila;plegada microsegundos' de flamegraph.pl,
+            speedscope o inferno (tiempo propio de cada pila)
+        """
+        return '\n'.join(
+            f'{";".join(pila)} {max(round(propios * 1e6), 0)}'
+            for pila, (_, propios, _) in self.registros.items()
+        ) + '\n'
+
+    def guardar(self, file: str):
+        """
+            .json: como_dict(); cualquier otra extensión: folded()
+        """
+        if Path(file).suffix.lower() == '.json':
+            texto = json.dumps(self.como_dict(), indent=4)
+        else:
+            texto = self.folded()
+        Path(file).write_text(texto)
@@ -0,0 +1,66 @@
+"""
+    Los dos módulos se llaman main.py, así que se cargan por ruta con un
+    nombre propio cada uno (igual que en benchmarks/rendimiento.py)
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def cargar(nombre: str, carpeta: str):
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(
+        nombre, RAIZ / carpeta / 'main.py'
+        )
+    modulo = importlib.util.module_from_spec(spec)
+    # dataclasses busca el módulo en sys.modules
+    sys.modules[nombre] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture(scope='session')
+def contable():
+    return cargar('analisis_contable', 'analisis contable')
+
+
+@pytest.fixture(scope='session')
+def finanzas():
+    return cargar('finanzas', 'finanzas')
+
+
+@pytest.fixture(scope='session')
+def modelo() -> str:
+    return str(RAIZ / 'analisis contable' / 'modelo.xlsx')
+
+
+@pytest.fixture(scope='session')
+def datos_empresas(contable):
+    """
+        Tabla larga sintética (empresa, periodo y todas las columnas), sin
+        ceros y con los signos de modelo.xlsx
+    """
+    def generar(empresas: int, periodos: int, semilla: int = 0):
+        generador = np.random.default_rng(semilla)
+        filas = empresas * periodos
+        tabla = {
+            'empresa': np.repeat(
+                [f'E{i:03d}' for i in range(empresas)], periodos
+                ),
+            'periodo': np.tile(
+                (np.arange(periodos) * 365 + 10_957) * 86_400_000, empresas
+                ),
+        }
+        for campo in contable.CAMPOS_NUMERICOS:
+            tabla[campo] = generador.uniform(1e3, 1e6, filas)
+        for campo in contable.CAMPOS_NO_POSITIVOS:
+            tabla[campo] = -tabla[campo]
+        return pd.DataFrame(tabla)
+    return generar
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def accion(finanzas):
+    return finanzas.AccionComun(
+        dividendo_esperado=2.0,
+        tasa_crecimiento=0.03,
+        tasa_descuento=0.1,
+        periodo=1,
+        tasa_crecimiento_lista=[0.01, 0.02, 0.05]
+    )
+
+
+def test_ddm_a_mano(finanzas):
+    # D0 = 2, crece 10 % y 5 %, luego 3 % constante, descuento 9 %
+    d1, d2 = 2 * 1.1, 2 * 1.1 * 1.05
+    terminal = d2 * 1.03 / (0.09 - 0.03)
+    esperado = d1 / 1.09 + d2 / 1.09 ** 2 + terminal / 1.09 ** 2
+    resultado = finanzas.ddm_multietapa(2, [0.1, 0.05], 0.03, 0.09)
+    assert resultado.valor == pytest.approx(esperado, rel=1e-12)
+    assert resultado.valor_terminal == pytest.approx(
+        terminal / 1.09 ** 2, rel=1e-12
+        )
+    assert resultado.valor_dividendos + resultado.valor_terminal == \
+        pytest.approx(resultado.valor, rel=1e-12)
+
+
+def test_ddm_muchas_acciones(finanzas):
+    generador = np.random.default_rng(0)
+    dividendo = generador.uniform(1, 5, 20)
+    crecimientos = generador.uniform(0, 0.2, (20, 6))
+    terminal = generador.uniform(0.01, 0.04, 20)
+    descuento = generador.uniform(0.07, 0.12, 20)
+    resultado = finanzas.ddm_multietapa(
+        dividendo, crecimientos, terminal, descuento
+        )
+    for i in range(20):
+        uno = finanzas.ddm_multietapa(
+            dividendo[i], crecimientos[i], terminal[i], descuento[i]
+            )
+        assert resultado.valor[i] == pytest.approx(uno.valor, rel=1e-12)
+
+
+def test_sin_etapa_igual_a_valor(accion):
+    assert accion.valor_multietapa([]) == pytest.approx(
+        accion.valor(), rel=1e-12
+        )
+
+
+def test_valor_multietapa(finanzas, accion):
+    esperado = finanzas.ddm_multietapa(2.0, [0.08, 0.06], 0.03, 0.1).valor
+    assert accion.valor_multietapa([0.08, 0.06]) == pytest.approx(esperado)
+
+
+def test_pronostico(accion):
+    esperado = [2 * 1.03 / (0.1 - tasa) for tasa in [0.01, 0.02, 0.05]]
+    assert accion.pronostico() == pytest.approx(esperado)
+
+
+def test_pronostico_tasa_igual_a_descuento(accion):
+    accion.tasa_crecimiento_lista = [0.05, 0.1]
+    with pytest.raises(ZeroDivisionError):
+        accion.pronostico()
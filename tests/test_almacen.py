@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def resultados(empresas, anos, semilla=0):
+    """
+        Tabla de resultados con una fila por empresa y año (31-12)
+    """
+    generador = np.random.default_rng(semilla)
+    filas = [(empresa, ano) for empresa in empresas for ano in anos]
+    return pd.DataFrame({
+        'empresa': [empresa for empresa, _ in filas],
+        'periodo': [f'31-12-{ano}' for _, ano in filas],
+        'roe': generador.uniform(size=len(filas)),
+        'liquidez': generador.uniform(size=len(filas)),
+    })
+
+
+def valor(tabla, empresa, ano, nombre):
+    fila = tabla[
+        (tabla['empresa'] == empresa) & (tabla['periodo'] == f'31-12-{ano}')
+    ]
+    return fila[nombre].item()
+
+
+def test_agregar_y_consultar(contable, tmp_path):
+    tabla = resultados(['A', 'B', 'C'], range(2015, 2020))
+    almacen = contable.AlmacenRatios(str(tmp_path))
+    assert almacen.agregar(tabla) == len(tabla)
+    assert almacen.ratio('roe').shape == (5, 3)
+    np.testing.assert_array_equal(
+        almacen.corte('roe', 2017),
+        [valor(tabla, empresa, 2017, 'roe') for empresa in 'ABC']
+    )
+    np.testing.assert_array_equal(
+        almacen.corte('liquidez', '31-12-2019'),
+        almacen.tabla_corte(2019)['liquidez'].to_numpy()
+    )
+    historia = almacen.historia('B')
+    assert list(historia.columns) == ['roe', 'liquidez']
+    np.testing.assert_array_equal(
+        historia['roe'],
+        [valor(tabla, 'B', ano, 'roe') for ano in range(2015, 2020)]
+    )
+
+
+def test_periodos_y_empresas_nuevos(contable, tmp_path):
+    primera = resultados(['A', 'B'], range(2000, 2010))
+    # Pasa la capacidad inicial (16) en los dos ejes: más periodos
+    # extienden los archivos y más empresas los reescriben
+    empresas = ['A', 'B', *[f'N{i:02d}' for i in range(20)]]
+    segunda = resultados(empresas, range(2010, 2030), semilla=1)
+    almacen = contable.AlmacenRatios(str(tmp_path))
+    almacen.agregar(primera)
+    almacen.agregar(segunda)
+    assert almacen.ratio('roe').shape == (30, 22)
+    assert almacen.capacidad[0] >= 30 and almacen.capacidad[1] >= 22
+
+    reabierto = contable.AlmacenRatios(str(tmp_path))
+    for nombre in ('roe', 'liquidez'):
+        np.testing.assert_array_equal(
+            reabierto.ratio(nombre), almacen.ratio(nombre)
+            )
+    assert reabierto.historia('A')['roe'].tolist() == [
+        valor(primera, 'A', ano, 'roe') for ano in range(2000, 2010)
+    ] + [valor(segunda, 'A', ano, 'roe') for ano in range(2010, 2030)]
+    # Las empresas nuevas no tienen datos antes de 2010
+    assert np.isnan(reabierto.corte('roe', 2005)[2:]).all()
+    assert len(reabierto.historia('N05')) == 20
+
+
+def test_reemplazar_celdas(contable, tmp_path):
+    almacen = contable.AlmacenRatios(str(tmp_path))
+    almacen.agregar(resultados(['A'], [2020]))
+    nueva = resultados(['A'], [2020], semilla=3)
+    almacen.agregar(nueva)
+    assert almacen.ratio('roe').shape == (1, 1)
+    assert almacen.corte('roe', 2020)[0] == nueva['roe'].item()
+
+
+def test_indice_guardado_tras_reservar(contable, tmp_path, monkeypatch):
+    almacen = contable.AlmacenRatios(str(tmp_path))
+    almacen.agregar(resultados(['A', 'B'], range(2000, 2005)))
+    anterior = almacen.ratio('roe').copy()
+
+    def falla(nombre):
+        raise RuntimeError('falla al escribir')
+    monkeypatch.setattr(almacen, 'abrir', falla)
+    empresas = [f'N{i:02d}' for i in range(20)]
+    with pytest.raises(RuntimeError):
+        almacen.agregar(resultados(empresas, range(2005, 2025)))
+
+    reabierto = contable.AlmacenRatios(str(tmp_path))
+    np.testing.assert_array_equal(reabierto.ratio('roe')[:5, :2], anterior)
+
+
+def test_sin_empresa(contable, tmp_path):
+    almacen = contable.AlmacenRatios(str(tmp_path))
+    tabla = resultados(['X'], range(2018, 2021)).drop(columns='empresa')
+    with pytest.raises(ValueError):
+        almacen.agregar(tabla)
+    almacen.agregar(tabla, empresa='X')
+    assert almacen.empresas == ['X']
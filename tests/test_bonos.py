@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+
+def tir_escalar(finanzas, tasa_cupon, valor_nominal, periodos, valor_mercado):
+    return finanzas.Bono(
+        tasa_cupon=tasa_cupon,
+        valor_nominal=valor_nominal,
+        periodos=periodos,
+        valor_mercado=valor_mercado
+    ).tir()
+
+
+def comparar(finanzas, tasa_cupon, valor_nominal, periodos, valor_mercado):
+    resultado = finanzas.tir_bonos(
+        tasa_cupon, valor_nominal, periodos, valor_mercado
+        )
+    assert resultado.convergio.all()
+    assert (
+        np.abs(resultado.residuo) <= 1e-8 * np.asarray(valor_mercado)
+    ).all()
+    esperado = [
+        tir_escalar(finanzas, *bono)
+        for bono in zip(tasa_cupon, valor_nominal, periodos, valor_mercado)
+    ]
+    np.testing.assert_allclose(resultado.tir, esperado, rtol=1e-8, atol=1e-10)
+
+
+def test_tir_bonos_aleatorios(finanzas):
+    generador = np.random.default_rng(0)
+    bonos = 500
+    comparar(
+        finanzas,
+        generador.uniform(0.01, 0.12, bonos).tolist(),
+        [1_000.0] * bonos,
+        generador.integers(1, 40, bonos).tolist(),
+        generador.uniform(700, 1_300, bonos).tolist()
+    )
+
+
+@pytest.mark.parametrize('tasa_cupon, periodos, valor_mercado', [
+    (0.0, 10, 600),      # cupón cero
+    (0.0, 1, 950),       # cupón cero a un periodo
+    (0.05, 1, 980),      # un solo periodo
+    (0.05, 30, 10),      # muy bajo la par
+    (0.08, 20, 1_000),   # a la par: TIR = tasa cupón
+    (0.1, 5, 1_500),     # sobre la par
+])
+def test_tir_bonos_casos_borde(finanzas, tasa_cupon, periodos, valor_mercado):
+    comparar(finanzas, [tasa_cupon], [1_000.0], [periodos], [valor_mercado])
+
+
+def test_tir_a_la_par(finanzas):
+    resultado = finanzas.tir_bonos(0.08, 1_000, 20, 1_000)
+    assert resultado.tir == pytest.approx(0.08, abs=1e-12)
+
+
+def test_tir_muy_sobre_la_par(finanzas):
+    # La raíz está debajo de -0.99: el intervalo se acerca a -1
+    comparar(finanzas, [0.05], [1_000.0], [1], [1e6])
+    resultado = finanzas.tir_bonos(0.05, 1_000, 1, 1e6)
+    assert resultado.tir == pytest.approx(-0.99895)
+
+
+@pytest.mark.parametrize('valor_mercado', [0, -5])
+def test_tir_precio_no_positivo(finanzas, valor_mercado):
+    with pytest.raises(ValueError):
+        finanzas.tir_bonos(
+            [0.05, 0.05], [1_000, 1_000], [3, 2], [900, valor_mercado]
+            )
+
+
+def test_tir_sin_raiz_no_converge(finanzas):
+    # Sin cupón ni nominal el precio es 0 para cualquier tasa
+    resultado = finanzas.tir_bonos([0.05, 0.0], [1_000, 0], [3, 3], [900, 100])
+    assert resultado.convergio.tolist() == [True, False]
@@ -0,0 +1,29 @@
+import pandas as pd
+
+
+def test_entrada_mayor_que_max_bytes(contable, modelo, tmp_path):
+    cache = contable.CacheResultados(str(tmp_path), max_bytes=100)
+    resultados = cache.obtener(modelo)
+    assert cache.entradas() == []
+    assert cache.estadisticas['desalojos'] == 1
+    referencia = pd.DataFrame(
+        contable.GenerarResultados(modelo).resultados_final()
+        )
+    assert list(resultados.columns) == list(referencia.columns)
+    assert len(resultados) == len(referencia)
+
+
+def test_acierto_igual_a_fallo(contable, modelo, tmp_path):
+    cache = contable.CacheResultados(str(tmp_path))
+    fallo = cache.obtener(modelo)
+    acierto = cache.obtener(modelo)
+    assert cache.estadisticas == {'aciertos': 1, 'fallos': 1, 'desalojos': 0}
+    pd.testing.assert_frame_equal(fallo, acierto)
+
+
+def test_entrada_borrada_cuenta_como_fallo(contable, modelo, tmp_path):
+    cache = contable.CacheResultados(str(tmp_path))
+    cache.obtener(modelo)
+    cache.invalidar()
+    cache.obtener(modelo)
+    assert cache.estadisticas['fallos'] == 2
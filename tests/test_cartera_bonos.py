@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def cartera(finanzas):
+    generador = np.random.default_rng(0)
+    return finanzas.CarteraBonos(
+        cantidad=generador.integers(1, 100, 50),
+        precio_nominal=np.full(50, 1_000.0),
+        precio_mercado=generador.uniform(700, 1_300, 50),
+        rentabilidad_vencimiento=generador.uniform(0.02, 0.1, 50)
+    )
+
+
+def totales(cartera):
+    return (
+        cartera.total_nominal,
+        cartera.total_mercado,
+        cartera.mercado_por_rentabilidad
+    )
+
+
+def test_indices_repetidos(cartera):
+    cartera.actualizar_precio([0, 3, 0, -1, 49], [900, 950, 800, 700, 600],
+                              [0.05, 0.06, 0.07, 0.08, 0.09])
+    assert cartera.precio_mercado[0] == 800
+    assert cartera.precio_mercado[49] == 600
+    assert cartera.rentabilidad_vencimiento[0] == 0.07
+    incremental = totales(cartera)
+    cartera.recalcular()
+    np.testing.assert_allclose(incremental, totales(cartera), rtol=1e-12)
+
+
+def test_indices_repetidos_sin_rentabilidad(cartera):
+    cartera.actualizar_precio([0, 0], [900, 800])
+    incremental = totales(cartera)
+    cartera.recalcular()
+    np.testing.assert_allclose(incremental, totales(cartera), rtol=1e-12)
+
+
+def test_copia_las_columnas(finanzas):
+    cantidad = np.array([1.0, 2.0])
+    cartera = finanzas.CarteraBonos(
+        cantidad=cantidad, precio_nominal=[1_000, 1_000],
+        precio_mercado=[900, 1_100]
+    )
+    cantidad[0] = 10
+    assert cartera.cantidad[0] == 1
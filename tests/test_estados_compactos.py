@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def tabla(contable):
+    generador = np.random.default_rng(0)
+    datos = {'periodo': (np.arange(4) * 365 + 10_957) * 86_400_000}
+    for campo in contable.CAMPOS_NUMERICOS:
+        datos[campo] = generador.uniform(1e3, 1e6, 4)
+    for campo in contable.CAMPOS_NO_POSITIVOS:
+        datos[campo] = -datos[campo]
+    return pd.DataFrame(datos)
+
+
+def test_una_empresa_escribible(contable, tabla):
+    estados = contable.EstadosCompactos.desde_tabla(tabla)
+    assert estados.valores.flags.writeable
+    assert estados.valores.flags.c_contiguous
+    estados.valores[0, 0] = 1.0
+    assert tabla[contable.CAMPOS_NUMERICOS[0]].iloc[0] != 1.0
+
+
+def test_varias_empresas_escribible(contable, tabla):
+    larga = pd.concat(
+        [tabla.assign(empresa='A'), tabla.assign(empresa='B')],
+        ignore_index=True
+    )
+    estados = contable.EstadosCompactos.desde_tabla(
+        larga, columna_empresa='empresa'
+        )
+    assert estados.valores.shape[1:] == (2, 4)
+    estados.valores[0, 0, 0] = 1.0
@@ -0,0 +1,160 @@
+import numpy as np
+import pytest
+
+VOLATILIDAD = {
+    'utilidad_operativa': 0.1,
+    'capex': 0.05,
+    'tasa_crecimiento': 0.005,
+    'tasa_descuento': 0.01,
+}
+
+
+def flujo_caja(finanzas, primer_flujo: float):
+    # primer_flujo < 0 usa la corrección de _fcl_correccion_npv
+    return finanzas.FlujoCajaLibre(
+        utilidad_operativa=[primer_flujo, 120, 150, 180],
+        depreciacion_amortizacion=[0, 20, 20, 20],
+        capex=[0, 30, 30, 30],
+        cambio_capital_trabajo=[0, 5, 5, 5],
+        impuesto_renta=[0, 25, 30, 35],
+        tasa_crecimiento=0.03,
+        tasa_descuento=0.12
+    )
+
+
+@pytest.fixture
+def accion(finanzas):
+    return finanzas.AccionComun(
+        dividendo_esperado=2.5,
+        tasa_descuento=0.1,
+        tasa_crecimiento=0.04,
+        periodo=2
+    )
+
+
+@pytest.mark.parametrize('primer_flujo', [-500, 90])
+def test_volatilidad_cero_igual_a_flujo(finanzas, accion, primer_flujo):
+    flujo = flujo_caja(finanzas, primer_flujo)
+    resultado = finanzas.MonteCarlo(
+        flujo=flujo,
+        volatilidad={variable: 0.0 for variable in VOLATILIDAD},
+        accion=accion,
+        simulaciones=50,
+        bloque=20,
+        semilla=0
+    ).simular()
+    np.testing.assert_allclose(resultado.vna, flujo.vna(), rtol=1e-12)
+    np.testing.assert_allclose(
+        resultado.vna_valor_residual, flujo.vna_valor_residual(),
+        rtol=1e-12
+        )
+    np.testing.assert_allclose(
+        resultado.valor_accion, accion.valor(), rtol=1e-12
+        )
+
+
+def test_volatilidad_cero_con_override(finanzas):
+    flujo = finanzas.FlujoCajaLibre(
+        tasa_crecimiento=0.03,
+        tasa_descuento=0.12,
+        fcl_override=[1_000.0, 1_100.0, 1_250.0]
+    )
+    resultado = finanzas.MonteCarlo(
+        flujo=flujo, volatilidad={'utilidad_operativa': 0.0},
+        simulaciones=10, semilla=0
+    ).simular()
+    np.testing.assert_allclose(resultado.vna, flujo.vna(), rtol=1e-12)
+    np.testing.assert_allclose(
+        resultado.vna_valor_residual, flujo.vna_valor_residual(),
+        rtol=1e-12
+        )
+
+
+@pytest.mark.parametrize('procesos', [None, 2])
+def test_resultado_no_depende_de_procesos(finanzas, accion, procesos):
+    opciones = dict(
+        flujo=flujo_caja(finanzas, -500),
+        volatilidad=VOLATILIDAD,
+        accion=accion,
+        simulaciones=1_000,
+        bloque=300,
+        semilla=7
+    )
+    uno = finanzas.MonteCarlo(**opciones).simular()
+    varios = finanzas.MonteCarlo(**opciones, procesos=procesos).simular()
+    for campo in ('vna', 'vna_valor_residual', 'valor_accion'):
+        np.testing.assert_array_equal(
+            getattr(varios, campo), getattr(uno, campo), err_msg=campo
+            )
+
+
+def test_misma_semilla_mismo_resultado(finanzas):
+    opciones = dict(
+        flujo=flujo_caja(finanzas, 90), volatilidad=VOLATILIDAD,
+        simulaciones=500, semilla=3
+    )
+    primero = finanzas.MonteCarlo(**opciones).simular()
+    segundo = finanzas.MonteCarlo(**opciones).simular()
+    np.testing.assert_array_equal(primero.vna, segundo.vna)
+    assert not np.array_equal(
+        primero.vna,
+        finanzas.MonteCarlo(**{**opciones, 'semilla': 4}).simular().vna
+        )
+
+
+def test_resumen(finanzas, accion):
+    resultado = finanzas.MonteCarlo(
+        flujo=flujo_caja(finanzas, 90),
+        volatilidad=VOLATILIDAD,
+        accion=accion,
+        simulaciones=2_000,
+        bloque=700,
+        semilla=0
+    ).simular()
+    assert resultado.vna.shape == (2_000,)
+    assert resultado.vna_valor_residual.shape == (2_000,)
+    assert resultado.valor_accion.shape == (2_000,)
+
+    resumen = resultado.resumen(cuantiles=(0.1, 0.5, 0.9))
+    assert list(resumen) == ['vna', 'vna_valor_residual', 'valor_accion']
+    for nombre, fila in resumen.items():
+        assert list(fila) == ['media', 'desviacion', 'invalidas',
+                              'p10', 'p50', 'p90']
+        valores = getattr(resultado, nombre)
+        assert fila['invalidas'] == int(np.isnan(valores).sum())
+        assert fila['media'] == pytest.approx(np.nanmean(valores))
+        assert fila['p10'] <= fila['p50'] <= fila['p90']
+
+
+def test_resumen_sin_accion(finanzas):
+    resumen = finanzas.MonteCarlo(
+        flujo=flujo_caja(finanzas, 90), volatilidad=VOLATILIDAD,
+        simulaciones=100, semilla=0
+    ).simular().resumen()
+    assert list(resumen) == ['vna', 'vna_valor_residual']
+    assert list(resumen['vna']) == [
+        'media', 'desviacion', 'invalidas', 'p5', 'p25', 'p50', 'p75', 'p95'
+    ]
+
+
+def test_tasas_invalidas_quedan_en_nan(finanzas):
+    # Con descuento <= crecimiento no hay valor residual
+    resultado = finanzas.MonteCarlo(
+        flujo=flujo_caja(finanzas, 90),
+        volatilidad={'tasa_crecimiento': 0.2},
+        simulaciones=1_000,
+        semilla=0
+    ).simular()
+    invalidas = np.isnan(resultado.vna_valor_residual)
+    assert 0 < invalidas.sum() < 1_000
+    assert resultado.resumen()['vna_valor_residual']['invalidas'] == (
+        invalidas.sum()
+        )
+    assert not np.isnan(resultado.vna).any()
+
+
+def test_variable_desconocida(finanzas):
+    with pytest.raises(ValueError):
+        finanzas.MonteCarlo(
+            flujo=flujo_caja(finanzas, 90), volatilidad={'ventas': 0.1}
+        )
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def con_ceros(tabla: pd.DataFrame, empresa: int = 0) -> pd.DataFrame:
+    """
+        Pone ceros en filas de una empresa: divisiones x/0 (inf) y
+        0/0 (NaN)
+    """
+    tabla = tabla.copy()
+    filas = np.flatnonzero(tabla['empresa'] == f'E{empresa:03d}')
+    tabla.loc[filas[1], 'ventas'] = 0.0
+    tabla.loc[
+        filas[2], ['ventas', 'cuentas_por_cobrar_comerciales_y_otras']
+    ] = 0.0
+    tabla.loc[filas[3], ['activo_total', 'patrimonio']] = 0.0
+    return tabla
+
+
+@pytest.fixture
+def archivo(datos_empresas, tmp_path):
+    tabla = con_ceros(datos_empresas(1, 8)).drop(columns='empresa')
+    ruta = tmp_path / 'empresa.csv'
+    tabla.to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_sin_propagar_nan_falla(contable, archivo):
+    for vectorizado in (True, False):
+        with pytest.raises(ZeroDivisionError):
+            contable.GenerarResultados(
+                archivo, vectorizado=vectorizado
+                ).resultados_final()
+
+
+def test_lista_y_vectorizado_iguales(contable, archivo):
+    vectorizado = contable.GenerarResultados(archivo, propagar_nan=True)
+    lista = contable.GenerarResultados(
+        archivo, vectorizado=False, propagar_nan=True
+        )
+    resultado = vectorizado.resultados_final()
+    referencia = lista.resultados_final()
+    hay_inf = hay_nan = False
+    # invalidos() tiene una máscara por cada ratio
+    for nombre in vectorizado.invalidos():
+        valores = np.asarray(resultado[nombre], dtype=np.float64)
+        np.testing.assert_array_equal(
+            valores, np.asarray(referencia[nombre], dtype=np.float64),
+            err_msg=nombre
+        )
+        hay_inf |= np.isinf(valores).any()
+        hay_nan |= np.isnan(valores).any()
+    assert hay_inf and hay_nan
+    for nombre, mascara in vectorizado.invalidos().items():
+        np.testing.assert_array_equal(mascara, lista.invalidos()[nombre])
+        np.testing.assert_array_equal(
+            mascara, ~np.isfinite(np.asarray(resultado[nombre], dtype=float))
+        )
+
+
+def test_invalidos_lote_sin_relleno(contable, datos_empresas):
+    tabla = con_ceros(datos_empresas(3, 6), empresa=1)
+    # La última empresa tiene menos periodos: hay relleno en el 2-D
+    tabla = tabla.iloc[:-2].reset_index(drop=True)
+    lote = contable.GenerarResultadosLote(tabla=tabla, propagar_nan=True)
+    resultado = lote.resultados_final()
+    invalidos = lote.invalidos()
+    assert invalidos
+    for nombre, mascara in invalidos.items():
+        assert mascara.shape == (len(resultado),)
+        np.testing.assert_array_equal(
+            mascara, ~np.isfinite(resultado[nombre].to_numpy(dtype=float)),
+            err_msg=nombre
+        )
+    filas_con_ceros = set(
+        np.flatnonzero(np.any(list(invalidos.values()), axis=0)).tolist()
+        )
+    assert filas_con_ceros <= set(range(6, 12))
+
+
+def test_conteo_invalidos_stream(contable, datos_empresas, tmp_path):
+    tabla = con_ceros(datos_empresas(3, 6), empresa=2)
+    entrada = tmp_path / 'tabla.csv'
+    tabla.to_csv(entrada, index=False)
+    salida = tmp_path / 'calculado.csv'
+    stream = contable.GenerarResultadosStream(
+        str(entrada), salida=str(salida), filas_por_bloque=4,
+        columna_empresa='empresa', propagar_nan=True
+    )
+    stream.csv()
+    calculado = pd.read_csv(salida)
+    lote = contable.GenerarResultadosLote(tabla=tabla, propagar_nan=True)
+    esperado = contable.contar_invalidos(lote.invalidos())
+    assert stream.conteo_invalidos == esperado
+    for nombre, cantidad in esperado.items():
+        assert (~np.isfinite(calculado[nombre])).sum() == cantidad
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def columnas(contable, modelo):
+    return contable.columnas_tabla(contable.leer_tabla(modelo))
+
+
+@pytest.fixture
+def registro(contable):
+    # La subclase del test no debe quedar en el registro global
+    antes = dict(contable.REGISTRO_RATIOS)
+    yield
+    contable.REGISTRO_RATIOS.clear()
+    contable.REGISTRO_RATIOS.update(antes)
+
+
+def test_subclase_hereda_ratios(contable, columnas, registro):
+    class Liquidez(contable.AnalisisLiquidez):
+        @contable.ratio('activo_corriente', 'activo_total')
+        def peso_corriente(activo_corriente, activo_total):
+            return activo_corriente / activo_total
+
+    padre = contable.GenerarResultados.get_metodos(contable.AnalisisLiquidez)
+    metodos = contable.GenerarResultados.get_metodos(Liquidez)
+    assert metodos == sorted([*padre, 'peso_corriente'])
+
+    hija = Liquidez(js=None, columnas=columnas)
+    original = contable.AnalisisLiquidez(js=None, columnas=columnas)
+    for metodo in padre:
+        np.testing.assert_array_equal(
+            getattr(hija, metodo)(), getattr(original, metodo)()
+            )
+    np.testing.assert_allclose(
+        hija.peso_corriente(),
+        columnas['activo_corriente'] / columnas['activo_total']
+    )
+    assert set(hija.invalidos()) == set(metodos)
+
+
+def resultados(contable, archivo, **opciones):
+    return contable.GenerarResultados(archivo, **opciones).resultados_final()
+
+
+def comparar_resultados(resultado, referencia):
+    assert list(resultado) == list(referencia)
+    for nombre, valores in referencia.items():
+        if nombre == 'periodo':
+            assert list(resultado[nombre]) == list(valores)
+        else:
+            np.testing.assert_allclose(
+                np.asarray(resultado[nombre], dtype=np.float64),
+                np.asarray(valores, dtype=np.float64),
+                rtol=1e-12, err_msg=nombre
+            )
+
+
+@pytest.fixture(scope='module')
+def sintetico(datos_empresas, tmp_path_factory):
+    # xlsx: el lector json solo lee Excel
+    archivo = tmp_path_factory.mktemp('sintetico') / 'empresa.xlsx'
+    datos_empresas(1, 40).drop(columns='empresa').to_excel(
+        archivo, index=False
+        )
+    return str(archivo)
+
+
+@pytest.mark.parametrize('origen', ['modelo', 'sintetico'])
+@pytest.mark.parametrize('vectorizado, lector', [
+    (True, 'json'), (False, 'columnar'), (True, 'columnar')
+])
+def test_backends_iguales(request, contable, origen, vectorizado, lector):
+    archivo = request.getfixturevalue(origen)
+    # Referencia: el cálculo original, List y lectura con Json
+    referencia = resultados(
+        contable, archivo, vectorizado=False, lector='json'
+        )
+    comparar_resultados(
+        resultados(contable, archivo, vectorizado=vectorizado, lector=lector),
+        referencia
+    )
+
+
+def test_columnar_sin_listas(contable, modelo, tmp_path):
+    generar = contable.GenerarResultados(modelo)
+    salida = tmp_path / 'calculado.csv'
+    generar.csv(str(salida))
+    # csv() escribe desde los arrays: Json y las List no se arman
+    assert 'data' not in vars(generar)
+    assert 'excel' not in vars(generar)
+
+    original = tmp_path / 'original.csv'
+    contable.GenerarResultados(modelo, lector='json').csv(str(original))
+    assert salida.read_text() == original.read_text()
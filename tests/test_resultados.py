@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def flujo(finanzas):
+    return finanzas.FlujoCajaLibre(
+        utilidad_operativa=[-500, 120, 150, 180],
+        depreciacion_amortizacion=[0, 20, 20, 20],
+        capex=[0, 30, 30, 30],
+        cambio_capital_trabajo=[0, 5, 5, 5],
+        impuesto_renta=[0, 25, 30, 35],
+        tasa_crecimiento=0.03,
+        tasa_descuento=0.12
+    )
+
+
+def test_fcl_calcular_igual_a_metodos(flujo):
+    resultado = flujo.calcular()
+    assert resultado.fcl == flujo.fcl()
+    assert resultado.valor_residual == flujo.valor_residual()
+    assert resultado.vna == flujo.vna()
+    assert resultado.vna_valor_residual == flujo.vna_valor_residual()
+    assert resultado.vna_perpetuidad == pytest.approx(
+        flujo.vna_valor_residual() - flujo.vna()
+        )
+
+
+def test_fcl_a_mano(flujo):
+    fcl = [0, 80, 105, 130]
+    residual = 130 * 1.03 / (0.12 - 0.03)
+    assert flujo.fcl() == fcl
+    assert flujo.valor_residual() == pytest.approx(residual)
+    assert flujo.vna_valor_residual() == pytest.approx(sum(
+        valor / 1.12 ** t
+        for t, valor in enumerate([*fcl[:-1], fcl[-1] + residual])
+    ))
+
+
+def test_wacc_resultado_igual_a_calcular(finanzas):
+    wacc = finanzas.WACC(
+        acciones_comun_precio=45,
+        acciones_comun_cantidad=43_030_000,
+        prima_mercado=0.105,
+        tasa_impuestos=0.3,
+        tasa_libre_riesgo=0.0525,
+        beta=0.84,
+        total_mercado_deuda_override=205_107_000,
+        bonos_tir=0.08
+    )
+    e, d = 45 * 43_030_000, 205_107_000
+    esperado = (
+        e / (e + d) * (0.0525 + 0.84 * 0.105) + d / (e + d) * 0.08
+    ) * 0.7
+    assert wacc.resultado() == pytest.approx(esperado)
+    assert wacc.resultado() == wacc.calcular().resultado
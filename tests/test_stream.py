@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def comparar(tabla: pd.DataFrame, referencia: pd.DataFrame):
+    assert list(tabla.columns) == list(referencia.columns)
+    assert len(tabla) == len(referencia)
+    for columna in referencia.columns:
+        if columna in ('empresa', 'periodo'):
+            assert tabla[columna].astype(str).tolist() == \
+                referencia[columna].astype(str).tolist()
+        else:
+            np.testing.assert_allclose(
+                tabla[columna].to_numpy(dtype=np.float64),
+                referencia[columna].to_numpy(dtype=np.float64)
+            )
+
+
+@pytest.fixture(scope='module')
+def referencia(contable, modelo):
+    return pd.DataFrame(contable.GenerarResultados(modelo).resultados_final())
+
+
+@pytest.mark.parametrize('filas', [2, 100_000])
+def test_stream_igual_a_generar_resultados(
+    contable, modelo, referencia, tmp_path, filas
+):
+    salida = tmp_path / 'calculado.csv'
+    escritas = contable.GenerarResultadosStream(
+        modelo, salida=str(salida), filas_por_bloque=filas
+        ).csv()
+    assert escritas == len(referencia)
+    comparar(pd.read_csv(salida), referencia)
+
+
+def test_incremental_igual_a_generar_resultados(
+    contable, modelo, referencia, tmp_path
+):
+    salida = tmp_path / 'calculado.csv'
+    contable.GenerarResultadosIncremental(modelo, salida=str(salida)).csv()
+    comparar(pd.read_csv(salida), referencia)
+
+
+def test_excel_sin_filas_vacias(contable, modelo):
+    bloques = list(contable.leer_bloques(modelo, 100_000))
+    tabla = pd.concat(bloques, ignore_index=True)
+    assert len(tabla) == len(pd.read_excel(modelo))
+    assert tabla.notna().all(axis=None)
+
+
+def test_periodo_vacio(contable):
+    periodo = pd.Series(pd.to_datetime(['2020-01-01', None]))
+    with pytest.raises(ValueError, match='periodo'):
+        contable.formato_periodo(periodo)
+
+
+def test_paralelo_sin_archivos(contable, tmp_path):
+    (tmp_path / 'empresa.csv').write_text('periodo\n')
+    with pytest.raises(FileNotFoundError):
+        contable.GenerarResultadosParalelo.desde_directorio(str(tmp_path))
+    paralelo = contable.GenerarResultadosParalelo.desde_directorio(
+        str(tmp_path), patron='*.csv'
+        )
+    assert len(paralelo.files) == 1
+
+
+@pytest.mark.parametrize('filas', [4, 100_000])
+def test_stream_con_nan_igual_a_lote(
+    contable, datos_empresas, tmp_path, filas
+):
+    tabla = datos_empresas(3, 6)
+    tabla.loc[2, 'inventarios'] = np.nan
+    entrada = tmp_path / 'tabla.csv'
+    tabla.to_csv(entrada, index=False)
+    salida = tmp_path / 'calculado.csv'
+    contable.GenerarResultadosStream(
+        str(entrada), salida=str(salida), filas_por_bloque=filas,
+        columna_empresa='empresa'
+    ).csv()
+    lote = pd.DataFrame(
+        contable.GenerarResultadosLote(tabla=tabla).resultados_final()
+        )
+    stream = pd.read_csv(salida)
+    assert stream['rotacion_de_inventarios'][2:6].isna().all()
+    comparar(stream, lote)
+
+
+@pytest.fixture
+def historia(datos_empresas, tmp_path):
+    tabla = datos_empresas(3, 6)
+    # Cada archivo tiene los periodos de todas las empresas
+    orden = tabla.sort_values(['periodo', 'empresa'], kind='stable')
+    primera, segunda = orden.iloc[:9], orden.iloc[9:]
+    archivos = []
+    for nombre, parte in [('primera.csv', primera), ('segunda.csv', segunda)]:
+        parte.to_csv(tmp_path / nombre, index=False)
+        archivos.append(str(tmp_path / nombre))
+    return tabla, archivos
+
+
+def resultados_por_empresa(tabla: pd.DataFrame) -> pd.DataFrame:
+    return tabla.sort_values(
+        ['empresa', 'periodo'], kind='stable',
+        key=lambda serie: pd.to_datetime(serie, format='%d-%m-%Y')
+        if serie.name == 'periodo' else serie
+    ).reset_index(drop=True)
+
+
+def test_incremental_en_dos_archivos(contable, historia, tmp_path):
+    tabla, (primera, segunda) = historia
+    salida = str(tmp_path / 'calculado.csv')
+    for archivo in (primera, segunda):
+        contable.GenerarResultadosIncremental(
+            archivo, salida=salida, columna_empresa='empresa'
+            ).csv()
+    lote = pd.DataFrame(
+        contable.GenerarResultadosLote(tabla=tabla).resultados_final()
+        )
+    comparar(resultados_por_empresa(pd.read_csv(salida)), lote)
+
+
+def test_incremental_no_repite_periodos(contable, historia, tmp_path):
+    tabla, (primera, segunda) = historia
+    salida = str(tmp_path / 'calculado.csv')
+    for archivo in (primera, primera, segunda, segunda):
+        incremental = contable.GenerarResultadosIncremental(
+            archivo, salida=salida, columna_empresa='empresa'
+            )
+        incremental.csv()
+    assert incremental.omitidas == 9
+    lote = pd.DataFrame(
+        contable.GenerarResultadosLote(tabla=tabla).resultados_final()
+        )
+    comparar(resultados_por_empresa(pd.read_csv(salida)), lote)
+
+
+def test_incremental_sin_estado(contable, historia, tmp_path):
+    tabla, (primera, segunda) = historia
+    salida = tmp_path / 'calculado.csv'
+    contable.GenerarResultadosStream(
+        primera, salida=str(salida), columna_empresa='empresa'
+        ).csv()
+    assert not salida.with_suffix('.estado.json').exists()
+    for archivo in (primera, segunda):
+        contable.GenerarResultadosIncremental(
+            archivo, salida=str(salida), columna_empresa='empresa'
+            ).csv()
+    lote = pd.DataFrame(
+        contable.GenerarResultadosLote(tabla=tabla).resultados_final()
+        )
+    comparar(resultados_por_empresa(pd.read_csv(salida)), lote)
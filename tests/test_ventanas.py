@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def test_media_movil_se_recupera_de_nan(contable):
+    valores = np.array([1, np.nan, 3, 4, 5, 6])
+    np.testing.assert_allclose(
+        contable.media_movil(valores, 2), [1, np.nan, np.nan, 3.5, 4.5, 5.5]
+        )
+
+
+def test_media_movil_igual_a_ventana_directa(contable):
+    valores = np.random.default_rng(0).uniform(size=(4, 12))
+    valores[1, 3] = np.nan
+    medias = contable.media_movil(valores, 3)
+    for t in range(valores.shape[1]):
+        esperado = valores[:, max(t - 2, 0):t + 1].mean(axis=1)
+        np.testing.assert_allclose(medias[:, t], esperado)
+
+
+def test_media_exponencial_se_recupera_de_nan(contable):
+    ventana = contable.Ventana('exponencial', alfa=0.5)
+    np.testing.assert_allclose(
+        ventana.aplicar(np.array([1, np.nan, 3, 4])), [1, np.nan, 2, 3]
+        )
+    np.testing.assert_allclose(
+        contable.media_exponencial(np.array([np.nan, 2, 4]), 0.5),
+        [np.nan, 2, 3]
+    )
+
+
+def test_media_exponencial_sin_nan(contable):
+    valores = np.random.default_rng(0).uniform(size=(3, 8))
+    medias = contable.media_exponencial(valores, 0.3)
+    esperado = valores[:, 0]
+    for t in range(valores.shape[1]):
+        if t:
+            esperado = 0.3 * valores[:, t] + 0.7 * esperado
+        np.testing.assert_allclose(medias[:, t], esperado)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def wacc(finanzas):
+    return finanzas.WACC(
+        acciones_comun_precio=45,
+        acciones_comun_cantidad=43_030_000,
+        prima_mercado=0.105,
+        tasa_impuestos=0.3,
+        tasa_libre_riesgo=0.0525,
+        beta=0.84,
+        acciones_preferente_precio=50,
+        acciones_preferente_cantidad=2_028_000,
+        acciones_dividendo=3,
+        total_mercado_deuda_override=205_107_000,
+        bonos_tir=0.08
+    )
+
+
+def test_escenarios_dividendo(wacc):
+    resultado = wacc.escenarios(acciones_dividendo=[2, 3])
+    np.testing.assert_allclose(
+        resultado['costo_acciones_preferentes'], [0.04, 0.06]
+        )
+    esperado = wacc.calcular().resultado
+    assert resultado['resultado'][1] == pytest.approx(esperado)
+
+
+def test_escenarios_precio_y_dividendo(wacc):
+    resultado = wacc.escenarios(
+        acciones_preferente_precio=[0, 40, 50], acciones_dividendo=[2, 3]
+        )
+    np.testing.assert_allclose(
+        resultado['costo_acciones_preferentes'],
+        [[0, 0], [2 / 40, 3 / 40], [2 / 50, 3 / 50]]
+    )
+    assert resultado['resultado'].shape == (3, 2)